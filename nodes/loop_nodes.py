@@ -15,6 +15,7 @@ from ..utils.loop_utils import (
     get_items_length,
     get_item_at_index,
     accumulate_results,
+    finalize_results,
 )
 
 # Try to import ComfyUI execution utilities
@@ -164,14 +165,14 @@ class LoopEndSimple:
 
         # Accumulate result1
         if result1 is not None:
-            acc1_node = graph.node("ComfyAngel_Accumulate", existing=prev_acc1, new_item=result1)
+            acc1_node = graph.node("ComfyAngel_Accumulate", existing=prev_acc1, new_item=result1, defer=True)
             accumulated1 = acc1_node.out(0)
         else:
             accumulated1 = prev_acc1
 
         # Accumulate result2
         if result2 is not None:
-            acc2_node = graph.node("ComfyAngel_Accumulate", existing=prev_acc2, new_item=result2)
+            acc2_node = graph.node("ComfyAngel_Accumulate", existing=prev_acc2, new_item=result2, defer=True)
             accumulated2 = acc2_node.out(0)
         else:
             accumulated2 = prev_acc2
@@ -246,7 +247,8 @@ class WhileLoopEndSimple:
 
     def while_end(self, flow, condition, next_index, accumulated1=None, accumulated2=None, dynprompt=None, unique_id=None):
         if not condition:
-            return (accumulated1, accumulated2)
+            # Loop finished - concatenate deferred tensor batches once
+            return (finalize_results(accumulated1), finalize_results(accumulated2))
 
         graph = GraphBuilder()
         loop_start_id = flow[0]
@@ -635,6 +637,7 @@ class Accumulate:
             "optional": {
                 "existing": (any_type,),
                 "new_item": (any_type,),
+                "defer": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -643,10 +646,10 @@ class Accumulate:
     CATEGORY = "ComfyAngel/Loop/Internal"
     DEPRECATED = True  # Hide from menu
 
-    def accumulate(self, existing=None, new_item=None):
+    def accumulate(self, existing=None, new_item=None, defer=False):
         if new_item is None:
             return (existing,)
-        return (accumulate_results(existing, new_item),)
+        return (accumulate_results(existing, new_item, defer=defer),)
 
 
 class FlowStateExtractor:
@@ -10,9 +10,9 @@ import torch
 import numpy as np
 from PIL import Image, ImageOps, ImageSequence
 
-from ..utils.tensor_ops import ensure_bhwc, to_pil, from_pil, clone_tensor
+from ..utils.tensor_ops import ensure_bhwc, to_pil_batch, from_pil, from_pil_into
 from ..utils.metadata_parser import read_image_metadata, GenerationParams, parse_a1111_format, parse_comfyui_format
-from ..utils.text_renderer import TextRenderer
+from ..utils.text_renderer import TextRenderer, get_default_renderer
 from ..utils.color_utils import hex_to_rgb
 
 # Try to import folder_paths from ComfyUI
@@ -22,6 +22,40 @@ except ImportError:
     folder_paths = None
 
 
+def _make_compositor(renderer: TextRenderer, position: str):
+    """
+    Resolve the overlay call for a position once per batch.
+
+    Returns a callable taking (pil_img, lines) so the per-image loop
+    doesn't re-dispatch on the position string.
+    """
+    if position == "bottom_extend":
+        return renderer.add_overlay_bottom
+    if position == "bottom_inside":
+        return lambda img, lines: renderer.add_overlay_inside(img, lines, "bottom")
+    # top_inside
+    return lambda img, lines: renderer.add_overlay_inside(img, lines, "top")
+
+
+def _render_batch(image: torch.Tensor, renderer: TextRenderer, lines: list[str], position: str) -> torch.Tensor:
+    """Render overlay lines onto every image in a BHWC batch."""
+    compositor = _make_compositor(renderer, position)
+    try:
+        with torch.no_grad():
+            # Every image in the batch has the same size, so every rendered
+            # result does too: size the output from the first one
+            frames = to_pil_batch(image)
+            first = from_pil(compositor(frames[0], lines))
+            output = torch.empty((image.shape[0], *first.shape[1:]), dtype=first.dtype)
+            output[0] = first[0]
+            for i in range(1, image.shape[0]):
+                from_pil_into(compositor(frames[i], lines), output[i])
+    finally:
+        # Blocks are reused within the batch only; the renderer is shared
+        renderer.clear_image_caches()
+    return output
+
+
 class LoadImageWithMetadata:
     """
     Load image and extract its metadata.
@@ -234,8 +268,6 @@ class ParameterOverlay:
         max_prompt_length: int = 50,
     ):
         image = ensure_bhwc(image)
-        batch_size = image.shape[0]
-        results = []
 
         # Parse metadata
         params = GenerationParams()
@@ -257,27 +289,14 @@ class ParameterOverlay:
             # No metadata found, return original
             return (image,)
 
-        # Create renderer
-        renderer = TextRenderer(
+        # Shared renderer: its caches persist across runs with the same settings
+        renderer = get_default_renderer(
             font_size=font_size,
             bg_opacity=bg_opacity,
         )
 
         # Process each image in batch
-        with torch.no_grad():
-            for i in range(batch_size):
-                pil_img = to_pil(image, i)
-
-                if position == "bottom_extend":
-                    result = renderer.add_overlay_bottom(pil_img, lines)
-                elif position == "bottom_inside":
-                    result = renderer.add_overlay_inside(pil_img, lines, "bottom")
-                else:  # top_inside
-                    result = renderer.add_overlay_inside(pil_img, lines, "top")
-
-                results.append(from_pil(result))
-
-            return (torch.cat(results, dim=0),)
+        return (_render_batch(image, renderer, lines, position),)
 
 
 class CustomTextOverlay:
@@ -327,9 +346,6 @@ class CustomTextOverlay:
         if not text.strip():
             return (image,)
 
-        batch_size = image.shape[0]
-        results = []
-
         # Parse colors
         text_rgb = hex_to_rgb(text_color, default=(255, 255, 255))
         bg_rgb = hex_to_rgb(bg_color, default=(0, 0, 0))
@@ -340,8 +356,8 @@ class CustomTextOverlay:
         if not lines:
             return (image,)
 
-        # Create renderer
-        renderer = TextRenderer(
+        # Shared renderer: its caches persist across runs with the same settings
+        renderer = get_default_renderer(
             font_size=font_size,
             bg_opacity=bg_opacity,
             text_color=text_rgb,
@@ -349,20 +365,7 @@ class CustomTextOverlay:
         )
 
         # Process each image in batch
-        with torch.no_grad():
-            for i in range(batch_size):
-                pil_img = to_pil(image, i)
-
-                if position == "bottom_extend":
-                    result = renderer.add_overlay_bottom(pil_img, lines)
-                elif position == "bottom_inside":
-                    result = renderer.add_overlay_inside(pil_img, lines, "bottom")
-                else:  # top_inside
-                    result = renderer.add_overlay_inside(pil_img, lines, "top")
-
-                results.append(from_pil(result))
-
-            return (torch.cat(results, dim=0),)
+        return (_render_batch(image, renderer, lines, position),)
 
 
 # Export for registration
@@ -5,13 +5,224 @@ Nodes with enhanced JS widget interfaces.
 """
 
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice, product
+from math import gcd
+from types import MappingProxyType
 import torch
+import torch.nn.functional as F
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageChops, ImageOps
 from PIL.PngImagePlugin import PngInfo
 
-from ..utils.tensor_ops import ensure_bhwc, to_pil, from_pil, clone_tensor
-from ..utils.color_utils import hex_to_rgb, rgb_to_hex
+from ..utils.tensor_ops import ensure_bhwc, ensure_contiguous_bhwc, ensure_mask_batch, to_pil, from_pil_into, to_uint8_array, array_to_pil
+from ..utils.color_utils import hex_to_rgb, normalize_hex, rgb_to_hex
+from ..utils.buffer_pool import acquire_buffer, release_buffer
+from ..utils.json_utils import dumps_json, loads_json
+
+# Optional: Numba-compiled blend kernel (falls back to NumPy if unavailable)
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Optional: fused elementwise expressions for the NumPy blend fallback
+try:
+    import numexpr
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
+
+@lru_cache(maxsize=8)
+def _loads_json_cached(text: str):
+    """
+    loads_json with a small cache, for reruns on the same document.
+
+    The result is shared between calls, so callers must not modify it.
+    """
+    return loads_json(text)
+
+
+# Integer ids for blend modes (used by the compiled kernel)
+_BLEND_MODE_IDS = {
+    "normal": 0,
+    "multiply": 1,
+    "screen": 2,
+    "overlay": 3,
+    "soft_light": 4,
+    "hard_light": 5,
+    "difference": 6,
+    "add": 7,
+    "subtract": 8,
+    "darken": 9,
+    "lighten": 10,
+}
+
+
+def _to_unit_float(arr: np.ndarray) -> np.ndarray:
+    """uint8 array -> float32 0.0-1.0 in one pass (cast and scale fused)."""
+    return np.multiply(arr, np.float32(1.0 / 255.0), dtype=np.float32)
+
+
+# NumPy blend formulas: (base_rgb, blend_rgb) -> result_rgb, values 0.0-1.0
+def _blend_normal(base, blend):
+    return blend
+
+
+def _blend_hard_light(base, blend):
+    # where(blend < 0.5, 2*base*blend, 1 - 2*(1-base)*(1-blend)), reusing buffers
+    result = np.multiply(base, blend)
+    result *= 2
+    screen = np.subtract(1, base)
+    screen *= np.subtract(1, blend)
+    screen *= 2
+    np.subtract(1, screen, out=screen)
+    np.copyto(result, screen, where=blend >= 0.5)
+    return result
+
+
+def _blend_overlay(base, blend):
+    # Overlay is hard light with the layers swapped
+    return _blend_hard_light(blend, base)
+
+
+def _blend_soft_light(base, blend):
+    # d = where(base <= 0.25, ((16*base - 12)*base + 4)*base, sqrt(base))
+    d = np.sqrt(base)
+    dark = base <= 0.25
+    if dark.any():
+        poly = base * 16
+        poly -= 12
+        poly *= base
+        poly += 4
+        poly *= base
+        np.copyto(d, poly, where=dark)
+
+    # k = 2*blend - 1; blend >= 0.5: base + k*(d - base), else base + k*base*(1 - base)
+    k = blend * 2
+    k -= 1
+    result = d
+    result -= base
+    result *= k
+    result += base
+    low = np.subtract(1, base)
+    low *= base
+    low *= k
+    low += base
+    np.copyto(result, low, where=blend < 0.5)
+    return result
+
+
+_BLEND_FUNCS = {
+    "normal": _blend_normal,
+    "multiply": np.multiply,
+    "screen": lambda base, blend: 1 - (1 - base) * (1 - blend),
+    "overlay": _blend_overlay,
+    "soft_light": _blend_soft_light,
+    "hard_light": _blend_hard_light,
+    "difference": lambda base, blend: np.abs(base - blend),
+    "add": lambda base, blend: np.clip(base + blend, 0, 1),
+    "subtract": lambda base, blend: np.clip(base - blend, 0, 1),
+    "darken": np.minimum,
+    "lighten": np.maximum,
+}
+
+# Torch blend formulas: same math as above, on float tensors
+def _tensor_blend_hard_light(base, blend):
+    return torch.where(blend < 0.5, 2 * base * blend, 1 - 2 * (1 - base) * (1 - blend))
+
+
+def _tensor_blend_soft_light(base, blend):
+    d = torch.where(base <= 0.25, ((16 * base - 12) * base + 4) * base, torch.sqrt(base))
+    return torch.where(
+        blend < 0.5,
+        base - (1 - 2 * blend) * base * (1 - base),
+        base + (2 * blend - 1) * (d - base),
+    )
+
+
+_TENSOR_BLEND_FUNCS = {
+    "normal": _blend_normal,
+    "multiply": torch.mul,
+    "screen": lambda base, blend: 1 - (1 - base) * (1 - blend),
+    "overlay": lambda base, blend: _tensor_blend_hard_light(blend, base),
+    "soft_light": _tensor_blend_soft_light,
+    "hard_light": _tensor_blend_hard_light,
+    "difference": lambda base, blend: (base - blend).abs(),
+    "add": lambda base, blend: (base + blend).clamp(0, 1),
+    "subtract": lambda base, blend: (base - blend).clamp(0, 1),
+    "darken": torch.minimum,
+    "lighten": torch.maximum,
+}
+
+# Separable modes PIL can do directly on uint8 RGB in C
+_CHOPS_BLENDS = {
+    "multiply": ImageChops.multiply,
+    "screen": ImageChops.screen,
+    "difference": ImageChops.difference,
+    "add": ImageChops.add,
+    "subtract": ImageChops.subtract,
+    "darken": ImageChops.darker,
+    "lighten": ImageChops.lighter,
+}
+
+if HAS_NUMBA:
+    # Compiled lazily on first call. No cache=True: numba's on-disk cache
+    # doesn't record the package name the file was imported under, and a
+    # stale entry from another name breaks every blend call
+    @njit(parallel=True, fastmath=True)
+    def _blend_kernel(base, blend, mode_id, out):
+        """Blend + alpha composite two RGB/RGBA uint8 arrays in a single pass."""
+        height, width = base.shape[0], base.shape[1]
+        base_has_alpha = base.shape[2] == 4
+        blend_has_alpha = blend.shape[2] == 4
+        inv = np.float32(1.0 / 255.0)
+        for py in prange(height):
+            for px in range(width):
+                base_a = np.float32(base[py, px, 3] * inv) if base_has_alpha else np.float32(1.0)
+                blend_a = np.float32(blend[py, px, 3] * inv) if blend_has_alpha else np.float32(1.0)
+                out_a = blend_a + base_a * (1 - blend_a)
+                out_a = min(max(out_a, np.float32(0.001)), np.float32(1.0))
+
+                for c in range(3):
+                    b = base[py, px, c] * inv
+                    s = blend[py, px, c] * inv
+                    if mode_id == 1:  # multiply
+                        r = b * s
+                    elif mode_id == 2:  # screen
+                        r = 1 - (1 - b) * (1 - s)
+                    elif mode_id == 3:  # overlay
+                        r = 2 * b * s if b < 0.5 else 1 - 2 * (1 - b) * (1 - s)
+                    elif mode_id == 4:  # soft_light
+                        if s < 0.5:
+                            r = b - (1 - 2 * s) * b * (1 - b)
+                        else:
+                            d = ((16 * b - 12) * b + 4) * b if b <= 0.25 else np.sqrt(b)
+                            r = b + (2 * s - 1) * (d - b)
+                    elif mode_id == 5:  # hard_light
+                        r = 2 * b * s if s < 0.5 else 1 - 2 * (1 - b) * (1 - s)
+                    elif mode_id == 6:  # difference
+                        r = abs(b - s)
+                    elif mode_id == 7:  # add
+                        r = min(b + s, np.float32(1.0))
+                    elif mode_id == 8:  # subtract
+                        r = max(b - s, np.float32(0.0))
+                    elif mode_id == 9:  # darken
+                        r = min(b, s)
+                    elif mode_id == 10:  # lighten
+                        r = max(b, s)
+                    else:  # normal
+                        r = s
+
+                    v = (r * blend_a + b * base_a * (1 - blend_a)) / out_a
+                    v = min(max(v, np.float32(0.0)), np.float32(1.0))
+                    out[py, px, c] = np.uint8(v * 255)
+
+                out[py, px, 3] = np.uint8(out_a * 255)
 
 
 class SmartCrop:
@@ -53,33 +264,42 @@ class SmartCrop:
         bg_rgb = hex_to_rgb(bg_color, default=(0, 0, 0))
         bg_normalized = [c / 255.0 for c in bg_rgb]
 
-        with torch.no_grad():
-            results = []
-            for b in range(batch_size):
-                # Create output canvas with background color
-                canvas = torch.zeros((crop_height, crop_width, channels), dtype=image.dtype, device=image.device)
-                for c in range(min(channels, 3)):
-                    canvas[:, :, c] = bg_normalized[c]
-
-                # Calculate source region (from original image)
-                src_x1 = max(0, x)
-                src_y1 = max(0, y)
-                src_x2 = min(img_width, x + crop_width)
-                src_y2 = min(img_height, y + crop_height)
+        # Background fill per channel (extra channels such as alpha stay 0)
+        fill = (bg_normalized + [0.0] * channels)[:channels]
+
+        # Calculate source region (from original image)
+        src_x1 = max(0, x)
+        src_y1 = max(0, y)
+        src_x2 = min(img_width, x + crop_width)
+        src_y2 = min(img_height, y + crop_height)
+
+        # Calculate destination region (on canvas)
+        dst_x1 = max(0, -x)
+        dst_y1 = max(0, -y)
+        dst_x2 = dst_x1 + (src_x2 - src_x1)
+        dst_y2 = dst_y1 + (src_y2 - src_y1)
+
+        # Crop fully inside the image: return a view like ComfyUI's ImageCrop
+        if (dst_x1, dst_y1, dst_x2, dst_y2) == (0, 0, crop_width, crop_height):
+            # Whole frame: nothing to crop
+            if crop_width == img_width and crop_height == img_height:
+                return (image,)
+            cropped = image.narrow(1, src_y1, crop_height).narrow(2, src_x1, crop_width)
+            # Small crops are cheap to compact, and later reads then stay cache-friendly
+            if crop_width * crop_height < img_width * img_height // 4:
+                cropped = cropped.contiguous()
+            return (cropped,)
 
-                # Calculate destination region (on canvas)
-                dst_x1 = max(0, -x)
-                dst_y1 = max(0, -y)
-                dst_x2 = dst_x1 + (src_x2 - src_x1)
-                dst_y2 = dst_y1 + (src_y2 - src_y1)
-
-                # Copy the overlapping region
-                if src_x2 > src_x1 and src_y2 > src_y1:
-                    canvas[dst_y1:dst_y2, dst_x1:dst_x2, :] = image[b, src_y1:src_y2, src_x1:src_x2, :]
+        with torch.no_grad():
+            # Create output canvas for the whole batch with background color
+            canvas = image.new_empty((batch_size, crop_height, crop_width, channels))
+            canvas[:] = torch.tensor(fill, dtype=image.dtype, device=image.device)
 
-                results.append(canvas)
+            # Copy the overlapping region
+            if src_x2 > src_x1 and src_y2 > src_y1:
+                canvas[:, dst_y1:dst_y2, dst_x1:dst_x2, :] = image[:, src_y1:src_y2, src_x1:src_x2, :]
 
-        return (torch.stack(results, dim=0),)
+        return (canvas,)
 
 
 class SolidColor:
@@ -112,15 +332,12 @@ class SolidColor:
         rgb = hex_to_rgb(color, default=(255, 255, 255))
 
         with torch.no_grad():
-            # Create numpy array with the color
-            img_np = np.full((height, width, 3), rgb, dtype=np.float32) / 255.0
-
-            # Convert to tensor
-            img_tensor = torch.from_numpy(img_np).unsqueeze(0)
+            # Normalized color as a single pixel
+            color_tensor = torch.tensor([c / 255.0 for c in rgb], dtype=torch.float32)
 
-            # Repeat for batch
-            if batch_size > 1:
-                img_tensor = img_tensor.repeat(batch_size, 1, 1, 1)
+            # Broadcast to (B, H, W, 3), then materialize once. Stays contiguous
+            # with its own memory per frame: downstream nodes may write into it
+            img_tensor = color_tensor.expand(batch_size, height, width, 3).contiguous()
 
         return (img_tensor,)
 
@@ -152,6 +369,9 @@ class ImageInfo:
         (4, 5, "4:5"),
     ]
 
+    # Precomputed (ratio, absolute tolerance, name) for detection (2% tolerance)
+    ASPECT_RATIO_VALUES = tuple((w / h, w / h * 0.02, name) for w, h, name in ASPECT_RATIOS)
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -202,21 +422,20 @@ class ImageInfo:
             summary,
         )
 
-    def _detect_aspect_ratio(self, width: int, height: int) -> str:
-        """Detect closest common aspect ratio."""
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _detect_aspect_ratio(width: int, height: int) -> str:
+        """Detect closest common aspect ratio (cached per width/height)."""
         if height == 0:
             return "unknown"
 
         actual_ratio = width / height
-        tolerance = 0.02  # 2% tolerance
 
-        for w, h, name in self.ASPECT_RATIOS:
-            expected = w / h
-            if abs(actual_ratio - expected) / expected < tolerance:
+        for expected, tolerance, name in ImageInfo.ASPECT_RATIO_VALUES:
+            if abs(actual_ratio - expected) < tolerance:
                 return name
 
         # If no match, return simplified ratio
-        from math import gcd
         divisor = gcd(width, height)
         simplified_w = width // divisor
         simplified_h = height // divisor
@@ -237,6 +456,20 @@ class _CompositeBase:
         "bottom_left", "bottom_center", "bottom_right",
     ]
 
+    # Anchor/reference point per position name, in half-sizes along (x, y):
+    # 0 = start, 1 = middle, 2 = end
+    ANCHOR_HALF_STEPS = MappingProxyType({
+        "top_left": (0, 0),
+        "top_center": (1, 0),
+        "top_right": (2, 0),
+        "middle_left": (0, 1),
+        "center": (1, 1),
+        "middle_right": (2, 1),
+        "bottom_left": (0, 2),
+        "bottom_center": (1, 2),
+        "bottom_right": (2, 2),
+    })
+
     BLEND_MODES = [
         "normal",
         "multiply",
@@ -251,14 +484,37 @@ class _CompositeBase:
         "lighten",
     ]
 
+    def _scaled_size(self, width: int, height: int, scale: float):
+        """Get overlay size after scaling (percent)."""
+        if scale != 100.0:
+            return max(1, int(width * scale / 100)), max(1, int(height * scale / 100))
+        return width, height
+
     def _scale_overlay(self, overlay_img, scale):
         """Scale overlay image."""
         if scale != 100.0:
-            new_w = max(1, int(overlay_img.width * scale / 100))
-            new_h = max(1, int(overlay_img.height * scale / 100))
-            return overlay_img.resize((new_w, new_h), Image.LANCZOS)
+            new_size = self._scaled_size(overlay_img.width, overlay_img.height, scale)
+            # Large downscales: cheap integer box reduce first, then LANCZOS the rest
+            return overlay_img.resize(new_size, Image.LANCZOS, reducing_gap=3.0)
         return overlay_img
 
+    def _scale_tensor(self, tensor: torch.Tensor, width: int, height: int) -> torch.Tensor:
+        """
+        Resize a BHWC (or BHW mask) batch on its own device.
+
+        Antialiased bilinear, close to PIL's filtered downscale but not
+        identical to the LANCZOS overlay resize.
+        """
+        is_mask = tensor.dim() == 3
+        if tuple(tensor.shape[1:3]) == (height, width):
+            return tensor
+        # interpolate wants channels-first
+        nchw = tensor.unsqueeze(1) if is_mask else tensor.movedim(-1, 1)
+        resized = F.interpolate(
+            nchw, size=(height, width), mode="bilinear", align_corners=False, antialias=True
+        ).clamp_(0, 1)
+        return resized.squeeze(1) if is_mask else resized.movedim(1, -1)
+
     def _blend_images(
         self,
         canvas: Image.Image,
@@ -267,18 +523,25 @@ class _CompositeBase:
         y: int,
         blend_mode: str,
         opacity: float,
+        owned: bool = False,
     ) -> Image.Image:
-        """Blend overlay onto canvas at position with blend mode and opacity."""
+        """
+        Blend overlay onto canvas at position with blend mode and opacity.
+
+        If owned is True, the caller hands over the canvas and it is
+        modified in place instead of being copied first.
+        """
         # Ensure canvas is RGB (our output format)
         if canvas.mode != "RGB":
             canvas = canvas.convert("RGB")
+            owned = True  # convert() already returned a new image
 
         # Ensure overlay is RGBA for alpha handling
         if overlay.mode != "RGBA":
             overlay = overlay.convert("RGBA")
 
-        # Create a copy of canvas to work with
-        result = canvas.copy()
+        # Work on a copy unless the canvas is ours to modify
+        result = canvas if owned else canvas.copy()
 
         # Apply opacity to overlay's alpha channel
         if opacity < 1.0:
@@ -296,8 +559,12 @@ class _CompositeBase:
 
         # For "normal" blend mode, use simple alpha compositing
         if blend_mode == "normal":
-            # Paste overlay onto canvas using overlay's alpha as mask
-            result.paste(overlay, (x, y), overlay)
+            if opacity >= 1.0 and overlay.getchannel("A").getextrema() == (255, 255):
+                # Fully opaque overlay: plain copy, no per-pixel blending
+                result.paste(overlay.convert("RGB"), (x, y))
+            else:
+                # Paste overlay onto canvas using overlay's alpha as mask
+                result.paste(overlay, (x, y), overlay)
             return result
 
         # For other blend modes, need more complex handling
@@ -313,112 +580,204 @@ class _CompositeBase:
         if src_x2 <= src_x1 or src_y2 <= src_y1:
             return result
 
-        # Crop visible regions
-        overlay_region = overlay.crop((src_x1, src_y1, src_x2, src_y2))
+        # Visible regions: canvas crop (RGB) and a view into the overlay array
         region_w = src_x2 - src_x1
         region_h = src_y2 - src_y1
-        canvas_region = canvas.crop((dst_x1, dst_y1, dst_x1 + region_w, dst_y1 + region_h))
-
-        # Convert canvas region to RGBA for blend mode processing
-        canvas_region_rgba = canvas_region.convert("RGBA")
+        canvas_region = np.asarray(canvas.crop((dst_x1, dst_y1, dst_x1 + region_w, dst_y1 + region_h)))
+        overlay_region = np.asarray(overlay)[src_y1:src_y2, src_x1:src_x2]
 
-        # Apply blend mode
-        blended = self._apply_blend_mode(canvas_region_rgba, overlay_region, blend_mode)
-
-        # Extract RGB and use overlay's alpha as mask for final composite
-        blended_rgb = Image.merge("RGB", blended.split()[:3])
-        overlay_alpha = overlay_region.split()[3]
+        # Apply blend mode (canvas region is opaque) into a pooled scratch buffer
+        blended = acquire_buffer((region_h, region_w, 4), np.uint8)
+        try:
+            self._apply_blend_mode(canvas_region, overlay_region, blend_mode, out=blended)
 
-        # Paste with alpha mask
-        result.paste(blended_rgb, (dst_x1, dst_y1), overlay_alpha)
+            # Paste blended RGB using overlay's alpha as mask (no mask needed if opaque)
+            blended_rgb = Image.fromarray(np.ascontiguousarray(blended[:, :, :3]), mode="RGB")
+            alpha_region = overlay_region[:, :, 3]
+            if (alpha_region == 255).all():
+                result.paste(blended_rgb, (dst_x1, dst_y1))
+            else:
+                overlay_alpha = Image.fromarray(np.ascontiguousarray(alpha_region), mode="L")
+                result.paste(blended_rgb, (dst_x1, dst_y1), overlay_alpha)
+        finally:
+            release_buffer(blended)
 
         return result
 
     def _apply_blend_mode(
         self,
-        base: Image.Image,
-        blend: Image.Image,
+        base: np.ndarray,
+        blend: np.ndarray,
         mode: str,
-    ) -> Image.Image:
-        """Apply blend mode between two images."""
-        import numpy as np
+        out: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        Apply blend mode between two images.
+
+        Args:
+            base: uint8 array (H, W, 3 or 4)
+            blend: uint8 array (H, W, 3 or 4), same H and W as base
+            mode: Blend mode name
+            out: Optional uint8 array (H, W, 4) to write the result into
+
+        Returns:
+            uint8 RGBA array (H, W, 4)
+        """
+        if out is None:
+            out = np.empty((*base.shape[:2], 4), dtype=np.uint8)
+
+        # Fast path: compiled single-pass kernel
+        if HAS_NUMBA:
+            _blend_kernel(base, blend, _BLEND_MODE_IDS.get(mode, 0), out)
+            return out
+
+        # Opaque inputs (no alpha, or alpha all 255) make the alpha composite a no-op
+        base_opaque = base.shape[2] != 4 or bool((base[:, :, 3] == 255).all())
+        blend_opaque = blend.shape[2] != 4 or bool((blend[:, :, 3] == 255).all())
+
+        # Separable modes: blend the uint8 RGB in PIL, no float temporaries
+        chop = _CHOPS_BLENDS.get(mode)
+        if chop is not None:
+            blended_rgb = np.asarray(chop(
+                Image.fromarray(np.ascontiguousarray(base[:, :, :3]), mode="RGB"),
+                Image.fromarray(np.ascontiguousarray(blend[:, :, :3]), mode="RGB"),
+            ))
+            if base_opaque and blend_opaque:
+                out[:, :, :3] = blended_rgb
+                out[:, :, 3] = 255
+                return out
 
         # Convert to float arrays
-        base_arr = np.array(base).astype(float) / 255.0
-        blend_arr = np.array(blend).astype(float) / 255.0
+        base_rgb = _to_unit_float(base[:, :, :3])
+
+        # Apply blend mode
+        if chop is not None:
+            result_rgb = _to_unit_float(blended_rgb)
+        else:
+            blend_rgb = _to_unit_float(blend[:, :, :3])
+            result_rgb = _BLEND_FUNCS.get(mode, _blend_normal)(base_rgb, blend_rgb)
+
+        if base_opaque and blend_opaque:
+            np.clip(result_rgb, 0, 1, out=result_rgb)
+            result_rgb *= 255
+            np.copyto(out[:, :, :3], result_rgb, casting="unsafe")
+            out[:, :, 3] = 255
+            return out
 
         # Split alpha if present
-        if base_arr.shape[2] == 4:
-            base_rgb = base_arr[:, :, :3]
-            base_alpha = base_arr[:, :, 3:4]
+        if base_opaque:
+            base_alpha = np.ones((*base.shape[:2], 1), dtype=np.float32)
         else:
-            base_rgb = base_arr
-            base_alpha = np.ones((*base_arr.shape[:2], 1))
+            base_alpha = _to_unit_float(base[:, :, 3:4])
 
-        if blend_arr.shape[2] == 4:
-            blend_rgb = blend_arr[:, :, :3]
-            blend_alpha = blend_arr[:, :, 3:4]
+        if blend_opaque:
+            blend_alpha = np.ones((*blend.shape[:2], 1), dtype=np.float32)
         else:
-            blend_rgb = blend_arr
-            blend_alpha = np.ones((*blend_arr.shape[:2], 1))
+            blend_alpha = _to_unit_float(blend[:, :, 3:4])
 
-        # Apply blend mode
-        if mode == "normal":
-            result_rgb = blend_rgb
-        elif mode == "multiply":
-            result_rgb = base_rgb * blend_rgb
-        elif mode == "screen":
-            result_rgb = 1 - (1 - base_rgb) * (1 - blend_rgb)
-        elif mode == "overlay":
-            mask = base_rgb < 0.5
-            result_rgb = np.where(
-                mask,
-                2 * base_rgb * blend_rgb,
-                1 - 2 * (1 - base_rgb) * (1 - blend_rgb)
-            )
-        elif mode == "soft_light":
-            result_rgb = np.where(
-                blend_rgb < 0.5,
-                base_rgb - (1 - 2 * blend_rgb) * base_rgb * (1 - base_rgb),
-                base_rgb + (2 * blend_rgb - 1) * (self._soft_light_d(base_rgb) - base_rgb)
-            )
-        elif mode == "hard_light":
-            mask = blend_rgb < 0.5
-            result_rgb = np.where(
-                mask,
-                2 * base_rgb * blend_rgb,
-                1 - 2 * (1 - base_rgb) * (1 - blend_rgb)
+        # Composite with alpha
+        if HAS_NUMEXPR:
+            # One fused pass per expression, no intermediate arrays
+            out_alpha = numexpr.evaluate("blend_alpha + base_alpha * (1 - blend_alpha)")
+            np.clip(out_alpha, 0.001, 1, out=out_alpha)  # Avoid division by zero
+            out_rgb = numexpr.evaluate(
+                "(result_rgb * blend_alpha + base_rgb * base_alpha * (1 - blend_alpha)) / out_alpha"
             )
-        elif mode == "difference":
-            result_rgb = np.abs(base_rgb - blend_rgb)
-        elif mode == "add":
-            result_rgb = np.clip(base_rgb + blend_rgb, 0, 1)
-        elif mode == "subtract":
-            result_rgb = np.clip(base_rgb - blend_rgb, 0, 1)
-        elif mode == "darken":
-            result_rgb = np.minimum(base_rgb, blend_rgb)
-        elif mode == "lighten":
-            result_rgb = np.maximum(base_rgb, blend_rgb)
         else:
-            result_rgb = blend_rgb
+            # In-place chain: result_rgb and base_rgb are scratch arrays we own
+            base_weight = np.subtract(1, blend_alpha)
+            base_weight *= base_alpha
+            out_alpha = np.add(blend_alpha, base_weight)
+            np.clip(out_alpha, 0.001, 1, out=out_alpha)  # Avoid division by zero
+            out_rgb = result_rgb
+            out_rgb *= blend_alpha
+            base_rgb *= base_weight
+            out_rgb += base_rgb
+            out_rgb /= out_alpha
+        np.clip(out_rgb, 0, 1, out=out_rgb)
+
+        # Write RGB and alpha straight into the output
+        out_rgb *= 255
+        out_alpha *= 255
+        np.copyto(out[:, :, :3], out_rgb, casting="unsafe")
+        np.copyto(out[:, :, 3:], out_alpha, casting="unsafe")
+        return out
+
+    def _blend_rgb_tensor(self, base: torch.Tensor, blend: torch.Tensor, mode: str) -> torch.Tensor:
+        """Apply blend mode formula on RGB tensors (values 0.0-1.0)."""
+        return _TENSOR_BLEND_FUNCS.get(mode, _blend_normal)(base, blend)
+
+    def _composite_tensor(
+        self,
+        canvas: torch.Tensor,
+        overlay_rgb: torch.Tensor,
+        overlay_alpha: torch.Tensor,
+        x: int,
+        y: int,
+        blend_mode: str,
+    ) -> torch.Tensor:
+        """
+        Composite an overlay batch onto a canvas batch without leaving torch.
 
-        # Composite with alpha
-        out_alpha = blend_alpha + base_alpha * (1 - blend_alpha)
-        out_alpha = np.clip(out_alpha, 0.001, 1)  # Avoid division by zero
+        Skips the PIL path's intermediate 8-bit rounding, so results differ
+        from it by up to ~4 levels (of 255) for non-normal blend modes.
 
-        out_rgb = (result_rgb * blend_alpha + base_rgb * base_alpha * (1 - blend_alpha)) / out_alpha
-        out_rgb = np.clip(out_rgb, 0, 1)
+        Args:
+            canvas: Canvas batch (B, H, W, C)
+            overlay_rgb: Overlay batch (B, h, w, 3), one per canvas item
+            overlay_alpha: Overlay alpha (B, h, w, 1) with opacity applied,
+                or None if the overlay is fully opaque
+            x, y: Top-left position of overlay on canvas
+            blend_mode: Blend mode name
 
-        # Combine RGB and alpha
-        result = np.concatenate([out_rgb, out_alpha], axis=2)
-        result = (result * 255).astype(np.uint8)
+        Returns:
+            RGB batch (B, H, W, 3)
+        """
+        ch, cw = canvas.shape[1], canvas.shape[2]
+        oh, ow = overlay_rgb.shape[1], overlay_rgb.shape[2]
 
-        return Image.fromarray(result, mode="RGBA")
+        # Calculate the visible region
+        src_x1 = max(0, -x)
+        src_y1 = max(0, -y)
+        src_x2 = min(ow, cw - x)
+        src_y2 = min(oh, ch - y)
+        if src_x2 <= src_x1 or src_y2 <= src_y1:
+            return canvas[..., :3].clone()
 
-    def _soft_light_d(self, x):
-        """Helper function for soft light blend mode."""
-        import numpy as np
-        return np.where(x <= 0.25, ((16 * x - 12) * x + 4) * x, np.sqrt(x))
+        dst_x1 = max(0, x)
+        dst_y1 = max(0, y)
+        dst_x2 = dst_x1 + (src_x2 - src_x1)
+        dst_y2 = dst_y1 + (src_y2 - src_y1)
+
+        over = overlay_rgb[:, src_y1:src_y2, src_x1:src_x2, :]
+
+        # Opaque normal overlay covering the whole canvas: the result is the overlay crop.
+        # Clone (like every other exit) so the output never aliases the overlay input
+        if overlay_alpha is None and blend_mode == "normal" and (dst_x2 - dst_x1, dst_y2 - dst_y1) == (cw, ch):
+            return over.clone(memory_format=torch.contiguous_format)
+
+        result = canvas[..., :3].clone()
+        base = result[:, dst_y1:dst_y2, dst_x1:dst_x2, :]
+
+        if overlay_alpha is None:
+            # Opaque overlay: normal is a straight copy, other modes replace the region
+            if blend_mode == "normal":
+                base.copy_(over)
+            else:
+                base.copy_(self._blend_rgb_tensor(base, over, blend_mode).clamp(0, 1))
+            return result
+
+        alpha = overlay_alpha[:, src_y1:src_y2, src_x1:src_x2, :]
+
+        if blend_mode == "normal":
+            blended = over
+        else:
+            # Same as PIL path: blend is alpha-composited, then pasted through the alpha again
+            blended = (self._blend_rgb_tensor(base, over, blend_mode) * alpha + base * (1 - alpha)).clamp(0, 1)
+
+        # base is a view into result: lerp in place, no full-region temporaries
+        base.lerp_(blended, alpha.expand_as(base))
+        return result
 
 
 class SmartCompositeXY(_CompositeBase):
@@ -436,6 +795,10 @@ class SmartCompositeXY(_CompositeBase):
                        "middle_left", "center", "middle_right",
                        "bottom_left", "bottom_center", "bottom_right"]
 
+    # Resampling filter for masks (soft masks look the same with bilinear;
+    # set to Image.LANCZOS for sharper mask edges)
+    MASK_RESAMPLE = Image.BILINEAR
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -453,6 +816,10 @@ class SmartCompositeXY(_CompositeBase):
             "optional": {
                 "mask": ("MASK",),
                 "invert_mask": ("BOOLEAN", {"default": True}),
+                "resize_on_device": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Scale overlay and mask with torch on the canvas device (bilinear) instead of PIL LANCZOS on CPU",
+                }),
             },
         }
 
@@ -474,11 +841,11 @@ class SmartCompositeXY(_CompositeBase):
         opacity: float,
         mask=None,
         invert_mask: bool = True,
+        resize_on_device: bool = False,
     ):
-        canvas = ensure_bhwc(canvas)
-        overlay = ensure_bhwc(overlay)
+        canvas = ensure_contiguous_bhwc(canvas)
+        overlay = ensure_contiguous_bhwc(overlay)
 
-        result = clone_tensor(canvas)
         batch_size = canvas.shape[0]
         overlay_batch = overlay.shape[0]
 
@@ -488,73 +855,134 @@ class SmartCompositeXY(_CompositeBase):
         # Calculate actual position from quick_position + offset
         actual_x, actual_y = self._calc_quick_position(x, y, quick_position, canvas_w, canvas_h)
 
-        results = []
+        # Unscaled overlays (with a matching mask, if any) can stay on-device;
+        # with resize_on_device, scaled ones are resized there too
+        use_tensor_path = (
+            canvas.shape[3] >= 3
+            and overlay.shape[3] >= 3
+            and (
+                resize_on_device
+                or (
+                    scale_percent == 100.0
+                    and (mask is None or tuple(mask.shape[-2:]) == tuple(overlay.shape[1:3]))
+                )
+            )
+        )
+
+        if use_tensor_path:
+            with torch.no_grad():
+                # Work in float32 like the PIL path, whatever the input precision
+                canvas = canvas.to(dtype=torch.float32)
+                overlay = overlay.to(device=canvas.device, dtype=torch.float32)
+                if resize_on_device:
+                    # Mask follows the overlay to its scaled size, as in the PIL path
+                    scaled_w, scaled_h = self._scaled_size(overlay.shape[2], overlay.shape[1], scale_percent)
+                    overlay = self._scale_tensor(overlay, scaled_w, scaled_h)
+                    if mask is not None:
+                        mask = self._scale_tensor(
+                            ensure_mask_batch(mask).to(device=canvas.device, dtype=torch.float32),
+                            scaled_w, scaled_h,
+                        )
+                if overlay_batch == 1:
+                    # Same overlay for every item: broadcast view, no copies
+                    overlay_batched = overlay.expand(batch_size, -1, -1, -1)
+                else:
+                    overlay_idx = torch.arange(batch_size, device=canvas.device).clamp(max=overlay_batch - 1)
+                    overlay_batched = overlay[overlay_idx]
+
+                if mask is not None:
+                    # Mask scales overlay alpha (inverted: ComfyUI MASK from LoadImage is inverted)
+                    mask = ensure_mask_batch(mask).to(device=canvas.device, dtype=torch.float32)
+                    mask_idx = torch.arange(batch_size, device=canvas.device).clamp(max=mask.shape[0] - 1)
+                    alpha = mask[mask_idx].unsqueeze(-1)
+                    if invert_mask:
+                        alpha = 1 - alpha
+                    if overlay_batched.shape[3] == 4:
+                        alpha = alpha * overlay_batched[..., 3:4]
+                elif overlay_batched.shape[3] == 4:
+                    alpha = overlay_batched[..., 3:4]
+                else:
+                    alpha = None  # Opaque overlay
+
+                if alpha is not None:
+                    alpha = alpha * (opacity / 100.0)
+                elif opacity < 100.0:
+                    alpha = torch.full_like(overlay_batched[..., :1], opacity / 100.0)
+
+                pos_x, pos_y = self._calc_anchor_position(
+                    actual_x, actual_y, anchor, overlay.shape[2], overlay.shape[1]
+                )
+                composited = self._composite_tensor(
+                    canvas, overlay_batched[..., :3], alpha, pos_x, pos_y, blend_mode
+                )
+            return (composited, x, y)
+
+        # Overlay size and position are the same for every batch item
+        scaled_w, scaled_h = self._scaled_size(overlay.shape[2], overlay.shape[1], scale_percent)
+        pos_x, pos_y = self._calc_anchor_position(actual_x, actual_y, anchor, scaled_w, scaled_h)
+
+        if mask is not None:
+            # Ensure mask is 3D [B, H, W]
+            mask = ensure_mask_batch(mask)
+
+        # Convert the whole canvas batch to uint8 once instead of per item
+        canvas_np = to_uint8_array(canvas)
+
+        # Output is always RGB float32 (from_pil)
+        output = torch.empty((batch_size, canvas_h, canvas_w, 3), dtype=torch.float32)
+
+        # Batch items past the overlay batch all reuse the last overlay, so
+        # convert and scale that one only once
+        scaled_overlays = {}
+        reused_idx = overlay_batch - 1 if overlay_batch < batch_size else None
 
         with torch.no_grad():
             for i in range(batch_size):
-                canvas_img = to_pil(result, i)
+                # canvas_np is our own copy, so blending into it in place is safe
+                canvas_img = array_to_pil(canvas_np[i])
                 overlay_idx = min(i, overlay_batch - 1)
-                overlay_img = to_pil(overlay, overlay_idx)
 
                 # Scale overlay
-                overlay_img = self._scale_overlay(overlay_img, scale_percent)
+                overlay_img = scaled_overlays.get(overlay_idx)
+                if overlay_img is None:
+                    overlay_img = self._scale_overlay(to_pil(overlay, overlay_idx), scale_percent)
+                    if overlay_idx == reused_idx:
+                        scaled_overlays[overlay_idx] = overlay_img
 
                 # Apply mask if provided
                 if mask is not None:
-                    # Ensure mask is 3D [B, H, W]
-                    if mask.dim() == 2:
-                        mask = mask.unsqueeze(0)
-
                     mask_idx = min(i, mask.shape[0] - 1)
                     mask_tensor = mask[mask_idx]
 
-                    # Get mask dimensions (before scaling)
-                    original_overlay = to_pil(overlay, overlay_idx)
-                    mask_h, mask_w = mask_tensor.shape
-
-                    # Resize mask to match scaled overlay dimensions
-                    scaled_w = overlay_img.width
-                    scaled_h = overlay_img.height
-
                     # Convert mask tensor to PIL for resizing
                     mask_np = (mask_tensor.cpu().numpy() * 255).astype(np.uint8)
                     mask_img = Image.fromarray(mask_np, mode="L")
 
                     # Invert mask if needed (ComfyUI MASK from LoadImage is inverted)
                     if invert_mask:
-                        from PIL import ImageOps
                         mask_img = ImageOps.invert(mask_img)
 
-                    # Resize mask to match original overlay size if needed
-                    if mask_img.size != original_overlay.size:
-                        mask_img = mask_img.resize(original_overlay.size, Image.LANCZOS)
-
-                    # Then resize to scaled overlay size
+                    # Resize mask straight to the scaled overlay size
                     if mask_img.size != (scaled_w, scaled_h):
-                        mask_img = mask_img.resize((scaled_w, scaled_h), Image.LANCZOS)
+                        mask_img = mask_img.resize((scaled_w, scaled_h), self.MASK_RESAMPLE)
 
                     # Apply mask as alpha channel
-                    if overlay_img.mode != "RGBA":
-                        overlay_img = overlay_img.convert("RGBA")
-
-                    # Use mask as alpha channel
                     # After invert: 255=opaque (show overlay), 0=transparent (show canvas)
-                    r, g, b, a = overlay_img.split()
-                    overlay_img = Image.merge("RGBA", (r, g, b, mask_img))
-
-                # Calculate position based on anchor (using actual position from quick_position + offset)
-                pos_x, pos_y = self._calc_anchor_position(
-                    actual_x, actual_y, anchor, overlay_img.width, overlay_img.height
-                )
+                    if overlay_img.mode == "RGBA":
+                        # Keep the overlay's own transparency: alpha = alpha * mask
+                        mask_img = ImageChops.multiply(overlay_img.getchannel("A"), mask_img)
+                    # convert() always copies, so a cached overlay is never modified
+                    overlay_img = overlay_img.convert("RGBA")
+                    overlay_img.putalpha(mask_img)
 
                 # Apply blend mode and composite
                 composited = self._blend_images(
-                    canvas_img, overlay_img, pos_x, pos_y, blend_mode, opacity / 100.0
+                    canvas_img, overlay_img, pos_x, pos_y, blend_mode, opacity / 100.0, owned=True
                 )
 
-                results.append(from_pil(composited))
+                from_pil_into(composited, output[i])
 
-        return (torch.cat(results, dim=0), x, y)
+        return (output, x, y)
 
     def _calc_quick_position(self, offset_x: int, offset_y: int, quick_pos: str, canvas_w: int, canvas_h: int):
         """
@@ -572,37 +1000,15 @@ class SmartCompositeXY(_CompositeBase):
             # Free mode: offset is absolute position from (0,0)
             return offset_x, offset_y
 
-        # Reference point positions on canvas
-        ref_positions = {
-            "top_left": (0, 0),
-            "top_center": (canvas_w // 2, 0),
-            "top_right": (canvas_w, 0),
-            "middle_left": (0, canvas_h // 2),
-            "center": (canvas_w // 2, canvas_h // 2),
-            "middle_right": (canvas_w, canvas_h // 2),
-            "bottom_left": (0, canvas_h),
-            "bottom_center": (canvas_w // 2, canvas_h),
-            "bottom_right": (canvas_w, canvas_h),
-        }
-
-        ref_x, ref_y = ref_positions.get(quick_pos, (0, 0))
-        return ref_x + offset_x, ref_y + offset_y
+        # Reference point on canvas (e.g. center = canvas_w // 2, canvas_h // 2)
+        hx, hy = self.ANCHOR_HALF_STEPS.get(quick_pos, (0, 0))
+        return canvas_w * hx // 2 + offset_x, canvas_h * hy // 2 + offset_y
 
     def _calc_anchor_position(self, x: int, y: int, anchor: str, w: int, h: int):
         """Calculate top-left position based on anchor point."""
-        anchor_offsets = {
-            "top_left": (0, 0),
-            "top_center": (-w // 2, 0),
-            "top_right": (-w, 0),
-            "middle_left": (0, -h // 2),
-            "center": (-w // 2, -h // 2),
-            "middle_right": (-w, -h // 2),
-            "bottom_left": (0, -h),
-            "bottom_center": (-w // 2, -h),
-            "bottom_right": (-w, -h),
-        }
-        ox, oy = anchor_offsets.get(anchor, (0, 0))
-        return x + ox, y + oy
+        # Same rounding as before: center of an odd width is -w // 2
+        hx, hy = self.ANCHOR_HALF_STEPS.get(anchor, (0, 0))
+        return x + (-w * hx) // 2, y + (-h * hy) // 2
 
 
 class ColorPicker:
@@ -633,17 +1039,8 @@ class ColorPicker:
         # JS widget handles eyedropper and updates color_hex directly
         # image input is for JS widget preview only
 
-        # Validate and normalize hex color
-        color_hex = color_hex.strip()
-        if not color_hex.startswith("#"):
-            color_hex = "#" + color_hex
-        # Expand shorthand (#FFF -> #FFFFFF)
-        if len(color_hex) == 4:
-            color_hex = "#" + "".join([c * 2 for c in color_hex[1:]])
-        # Validate format
-        if len(color_hex) != 7:
-            color_hex = "#FFFFFF"
-        return (color_hex.upper(),)
+        # Validate and normalize hex color (cached per widget value)
+        return (normalize_hex(color_hex),)
 
 
 class ImageBridge:
@@ -662,6 +1059,9 @@ class ImageBridge:
     but output remains original (unmodified) images.
     """
 
+    # Next free save counter per (output_dir, prefix), shared across instances
+    _save_counters: dict[tuple[str, str], int] = {}
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -728,56 +1128,279 @@ class ImageBridge:
         # Create metadata (same as official SaveImage) - only if save_metadata is True
         metadata = None
         if save_metadata:
+            # Compact JSON: the chunks are written into every saved file
             metadata = PngInfo()
             if prompt is not None:
-                metadata.add_text("prompt", json.dumps(prompt))
+                metadata.add_text("prompt", json.dumps(prompt, separators=(",", ":")))
             if extra_pnginfo is not None:
-                for key in extra_pnginfo:
-                    metadata.add_text(key, json.dumps(extra_pnginfo[key]))
+                for key, value in extra_pnginfo.items():
+                    metadata.add_text(key, json.dumps(value, separators=(",", ":")))
+
+        def discard(filepath):
+            # Remove a reserved or partly written file; it may already be gone
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
 
+        # Resolve filenames serially (counter lookup must stay ordered)
         results = []
-        with torch.no_grad():
-            # Process each image separately (like official PreviewImage)
-            for i, t in enumerate(original_tensors):
-                pil_img = to_pil(t, 0)  # Each tensor has batch=1, so index 0
-
-                if mode == "save":
-                    output_dir = folder_paths.get_output_directory()
-                    subfolder = ""
-
-                    # Generate unique filename
-                    counter = 1
-                    while True:
-                        filename = f"{filename_prefix}_{counter:05d}.png"
-                        filepath = os.path.join(output_dir, filename)
-                        if not os.path.exists(filepath):
-                            break
+        save_jobs = []  # (tensor, filepath, save kwargs)
+        reserved = []  # empty placeholder files created by the O_EXCL reservation
+        for i, t in enumerate(original_tensors):
+            if mode == "save":
+                output_dir = folder_paths.get_output_directory()
+                subfolder = ""
+
+                # Generate unique filename, resuming from the last counter used for this prefix.
+                # O_EXCL reserves the name atomically, so concurrent saves can't pick the same file.
+                counter_key = (output_dir, filename_prefix)
+                counter = self._save_counters.get(counter_key, 1)
+                while True:
+                    filename = f"{filename_prefix}_{counter:05d}.png"
+                    filepath = os.path.join(output_dir, filename)
+                    try:
+                        os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                        break
+                    except FileExistsError:
                         counter += 1
-
-                    pil_img.save(filepath, pnginfo=metadata, compress_level=4)
-
-                    results.append({
-                        "filename": filename,
-                        "subfolder": subfolder,
-                        "type": "output",
-                    })
-                else:
-                    # Preview - save each image separately
-                    temp_dir = folder_paths.get_temp_directory()
-                    filename = f"imgbridge_{unique_id}_{i:03d}.png"
-                    filepath = os.path.join(temp_dir, filename)
-                    pil_img.save(filepath, pnginfo=metadata)
-
-                    results.append({
-                        "filename": filename,
-                        "subfolder": "",
-                        "type": "temp",
-                    })
+                    except OSError:
+                        # Nothing was written yet: drop the names reserved so far
+                        for path in reserved:
+                            discard(path)
+                        raise
+                reserved.append(filepath)
+                self._save_counters[counter_key] = counter + 1
+
+                save_jobs.append((t, filepath, {"pnginfo": metadata, "compress_level": 4}))
+                results.append({
+                    "filename": filename,
+                    "subfolder": subfolder,
+                    "type": "output",
+                })
+            else:
+                # Preview - save each image separately
+                temp_dir = folder_paths.get_temp_directory()
+                filename = f"imgbridge_{unique_id}_{i:03d}.png"
+                filepath = os.path.join(temp_dir, filename)
+
+                # Temp previews are transient: favour encode speed over size (like ComfyUI's PreviewImage)
+                save_jobs.append((t, filepath, {"pnginfo": metadata, "compress_level": 1}))
+                results.append({
+                    "filename": filename,
+                    "subfolder": "",
+                    "type": "temp",
+                })
+
+        def save_one(job):
+            t, filepath, save_kwargs = job
+            try:
+                with torch.no_grad():
+                    pil_img = to_pil(t, 0)  # Each tensor has batch=1, so index 0
+                pil_img.save(filepath, **save_kwargs)
+            except Exception:
+                # Don't leave an empty or truncated PNG in the output dir
+                discard(filepath)
+                raise
+
+        # PNG encoding (zlib) releases the GIL, so encode images in parallel
+        if len(save_jobs) > 1:
+            max_workers = min(len(save_jobs), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(save_one, save_jobs))
+        else:
+            for job in save_jobs:
+                save_one(job)
 
         # Return original tensors as list (OUTPUT_IS_LIST handles this)
         return {"ui": {"images": results}, "result": (original_tensors,)}
 
 
+# Resolutions organized by aspect ratio
+# Includes AI model optimized sizes integrated into standard ratios
+_RESOLUTIONS = {
+    "1:1 (Square)": {
+        # SD 1.5 native
+        "512x512 (SD1.5)": (512, 512),
+        # SD 1.5 fine-tuned
+        "768x768 (SD1.5 HiRes)": (768, 768),
+        # SDXL/SD3/SD3.5/Flux/Kolors/Z-Image native
+        "1024x1024 (SDXL/SD3/Flux)": (1024, 1024),
+        # Instagram / Social
+        "1080x1080 (Instagram)": (1080, 1080),
+        # Hunyuan-DiT
+        "1280x1280 (Hunyuan)": (1280, 1280),
+        # Qwen-Image native (~1.6MP)
+        "1328x1328 (Qwen-Image)": (1328, 1328),
+        # 2K
+        "1440x1440 (2K)": (1440, 1440),
+        # Flux Pro Ultra / Hunyuan 2.1+
+        "2048x2048 (Flux Ultra/Hunyuan)": (2048, 2048),
+        # 4K
+        "4096x4096 (4K)": (4096, 4096),
+    },
+    "4:3 (Standard)": {
+        # Classic VGA
+        "640x480 (VGA/480p)": (640, 480),
+        # SVGA
+        "800x600 (SVGA)": (800, 600),
+        # XGA
+        "1024x768 (XGA)": (1024, 768),
+        # SDXL optimized (close to 4:3)
+        "1152x896 (SDXL ~9:7)": (1152, 896),
+        # SXGA+
+        "1280x960 (SXGA+)": (1280, 960),
+        # Qwen-Image 4:3
+        "1472x1104 (Qwen-Image)": (1472, 1104),
+        # UXGA
+        "1600x1200 (UXGA)": (1600, 1200),
+        # 2K
+        "2048x1536 (2K)": (2048, 1536),
+        # 3K
+        "2880x2160 (3K)": (2880, 2160),
+        # 4K
+        "4096x3072 (4K)": (4096, 3072),
+    },
+    "3:2 (Photo)": {
+        # SD 1.5
+        "768x512 (SD1.5)": (768, 512),
+        # Basic
+        "720x480": (720, 480),
+        # 720p-ish
+        "1080x720": (1080, 720),
+        # SDXL optimized 3:2
+        "1216x832 (SDXL)": (1216, 832),
+        # HD-ish
+        "1440x960": (1440, 960),
+        # Qwen-Image 3:2
+        "1584x1056 (Qwen-Image)": (1584, 1056),
+        # FHD-ish
+        "1620x1080": (1620, 1080),
+        # 2K
+        "2160x1440 (2K)": (2160, 1440),
+        # 3K
+        "3000x2000 (3K)": (3000, 2000),
+        # 4K
+        "4320x2880 (4K)": (4320, 2880),
+        # 6K
+        "6000x4000 (6K)": (6000, 4000),
+    },
+    "16:9 (Widescreen)": {
+        # 360p
+        "640x360 (360p)": (640, 360),
+        # 480p
+        "854x480 (480p)": (854, 480),
+        # 720p HD
+        "1280x720 (720p HD)": (1280, 720),
+        # SDXL optimized 16:9
+        "1344x768 (SDXL)": (1344, 768),
+        # Qwen-Image 16:9
+        "1664x928 (Qwen-Image)": (1664, 928),
+        # DALL-E 3 landscape
+        "1792x1024 (DALL-E 3)": (1792, 1024),
+        # 1080p FHD
+        "1920x1080 (1080p FHD)": (1920, 1080),
+        # 1440p QHD
+        "2560x1440 (1440p 2K QHD)": (2560, 1440),
+        # Hunyuan 2.1
+        "2560x1536 (Hunyuan 2.1)": (2560, 1536),
+        # 4K UHD
+        "3840x2160 (2160p 4K UHD)": (3840, 2160),
+        # 5K
+        "5120x2880 (5K)": (5120, 2880),
+        # 8K
+        "7680x4320 (8K)": (7680, 4320),
+    },
+    "21:9 (Ultrawide)": {
+        # SDXL optimized 21:9
+        "1536x640 (SDXL)": (1536, 640),
+        # Cinema
+        "1280x548 (Cinema)": (1280, 548),
+        # Cinema HD
+        "1720x720 (Cinema HD)": (1720, 720),
+        # UWFHD
+        "2560x1080 (UWFHD)": (2560, 1080),
+        # UWQHD
+        "3440x1440 (UWQHD)": (3440, 1440),
+        # Wide 4K
+        "3840x1600 (Wide 4K)": (3840, 1600),
+        # 5K UW
+        "5120x2160 (5K UW)": (5120, 2160),
+    },
+    "9:16 (Portrait Mobile)": {
+        # Basic
+        "360x640": (360, 640),
+        # 480p
+        "480x854 (480p)": (480, 854),
+        # 720p HD
+        "720x1280 (720p HD)": (720, 1280),
+        # SDXL optimized 9:16
+        "768x1344 (SDXL)": (768, 1344),
+        # Qwen-Image 9:16
+        "928x1664 (Qwen-Image)": (928, 1664),
+        # DALL-E 3 portrait
+        "1024x1792 (DALL-E 3)": (1024, 1792),
+        # 1080p FHD
+        "1080x1920 (1080p FHD)": (1080, 1920),
+        # 2K
+        "1440x2560 (1440p 2K)": (1440, 2560),
+        # 4K
+        "2160x3840 (4K)": (2160, 3840),
+    },
+    "3:4 (Portrait Standard)": {
+        # VGA
+        "480x640 (VGA)": (480, 640),
+        # SVGA
+        "600x800 (SVGA)": (600, 800),
+        # XGA
+        "768x1024 (XGA)": (768, 1024),
+        # SDXL optimized ~7:9
+        "896x1152 (SDXL ~7:9)": (896, 1152),
+        # SXGA
+        "960x1280 (SXGA)": (960, 1280),
+        # Qwen-Image 3:4
+        "1104x1472 (Qwen-Image)": (1104, 1472),
+        # UXGA
+        "1200x1600 (UXGA)": (1200, 1600),
+        # 2K
+        "1536x2048 (2K)": (1536, 2048),
+        # 4K
+        "3072x4096 (4K)": (3072, 4096),
+    },
+    "2:3 (Portrait Photo)": {
+        # SD 1.5
+        "512x768 (SD1.5)": (512, 768),
+        # Basic
+        "480x720": (480, 720),
+        # Basic HD
+        "720x1080": (720, 1080),
+        # SDXL optimized 2:3
+        "832x1216 (SDXL)": (832, 1216),
+        # HD
+        "960x1440": (960, 1440),
+        # Qwen-Image 2:3
+        "1056x1584 (Qwen-Image)": (1056, 1584),
+        # FHD
+        "1080x1620 (FHD)": (1080, 1620),
+        # 2K
+        "1440x2160 (2K)": (1440, 2160),
+        # 3K
+        "2000x3000 (3K)": (2000, 3000),
+        # 4K
+        "2880x4320 (4K)": (2880, 4320),
+    },
+}
+
+
+def _build_resolution_index(table: dict) -> dict:
+    """Flatten the resolution table by name; the first aspect ratio wins for shared names."""
+    index = {}
+    for aspect, resolutions in table.items():
+        for name, (width, height) in resolutions.items():
+            index.setdefault(name, (width, height, aspect))
+    return index
+
+
 class ResolutionPicker:
     """
     Pick from common image resolutions by aspect ratio.
@@ -798,192 +1421,31 @@ class ResolutionPicker:
         "2:3 (Portrait Photo)",
     ]
 
-    # Resolutions organized by aspect ratio
-    # Includes AI model optimized sizes integrated into standard ratios
-    RESOLUTIONS = {
-        "1:1 (Square)": {
-            # SD 1.5 native
-            "512x512 (SD1.5)": (512, 512),
-            # SD 1.5 fine-tuned
-            "768x768 (SD1.5 HiRes)": (768, 768),
-            # SDXL/SD3/SD3.5/Flux/Kolors/Z-Image native
-            "1024x1024 (SDXL/SD3/Flux)": (1024, 1024),
-            # Instagram / Social
-            "1080x1080 (Instagram)": (1080, 1080),
-            # Hunyuan-DiT
-            "1280x1280 (Hunyuan)": (1280, 1280),
-            # Qwen-Image native (~1.6MP)
-            "1328x1328 (Qwen-Image)": (1328, 1328),
-            # 2K
-            "1440x1440 (2K)": (1440, 1440),
-            # Flux Pro Ultra / Hunyuan 2.1+
-            "2048x2048 (Flux Ultra/Hunyuan)": (2048, 2048),
-            # 4K
-            "4096x4096 (4K)": (4096, 4096),
-        },
-        "4:3 (Standard)": {
-            # Classic VGA
-            "640x480 (VGA/480p)": (640, 480),
-            # SVGA
-            "800x600 (SVGA)": (800, 600),
-            # XGA
-            "1024x768 (XGA)": (1024, 768),
-            # SDXL optimized (close to 4:3)
-            "1152x896 (SDXL ~9:7)": (1152, 896),
-            # SXGA+
-            "1280x960 (SXGA+)": (1280, 960),
-            # Qwen-Image 4:3
-            "1472x1104 (Qwen-Image)": (1472, 1104),
-            # UXGA
-            "1600x1200 (UXGA)": (1600, 1200),
-            # 2K
-            "2048x1536 (2K)": (2048, 1536),
-            # 3K
-            "2880x2160 (3K)": (2880, 2160),
-            # 4K
-            "4096x3072 (4K)": (4096, 3072),
-        },
-        "3:2 (Photo)": {
-            # SD 1.5
-            "768x512 (SD1.5)": (768, 512),
-            # Basic
-            "720x480": (720, 480),
-            # 720p-ish
-            "1080x720": (1080, 720),
-            # SDXL optimized 3:2
-            "1216x832 (SDXL)": (1216, 832),
-            # HD-ish
-            "1440x960": (1440, 960),
-            # Qwen-Image 3:2
-            "1584x1056 (Qwen-Image)": (1584, 1056),
-            # FHD-ish
-            "1620x1080": (1620, 1080),
-            # 2K
-            "2160x1440 (2K)": (2160, 1440),
-            # 3K
-            "3000x2000 (3K)": (3000, 2000),
-            # 4K
-            "4320x2880 (4K)": (4320, 2880),
-            # 6K
-            "6000x4000 (6K)": (6000, 4000),
-        },
-        "16:9 (Widescreen)": {
-            # 360p
-            "640x360 (360p)": (640, 360),
-            # 480p
-            "854x480 (480p)": (854, 480),
-            # 720p HD
-            "1280x720 (720p HD)": (1280, 720),
-            # SDXL optimized 16:9
-            "1344x768 (SDXL)": (1344, 768),
-            # Qwen-Image 16:9
-            "1664x928 (Qwen-Image)": (1664, 928),
-            # DALL-E 3 landscape
-            "1792x1024 (DALL-E 3)": (1792, 1024),
-            # 1080p FHD
-            "1920x1080 (1080p FHD)": (1920, 1080),
-            # 1440p QHD
-            "2560x1440 (1440p 2K QHD)": (2560, 1440),
-            # Hunyuan 2.1
-            "2560x1536 (Hunyuan 2.1)": (2560, 1536),
-            # 4K UHD
-            "3840x2160 (2160p 4K UHD)": (3840, 2160),
-            # 5K
-            "5120x2880 (5K)": (5120, 2880),
-            # 8K
-            "7680x4320 (8K)": (7680, 4320),
-        },
-        "21:9 (Ultrawide)": {
-            # SDXL optimized 21:9
-            "1536x640 (SDXL)": (1536, 640),
-            # Cinema
-            "1280x548 (Cinema)": (1280, 548),
-            # Cinema HD
-            "1720x720 (Cinema HD)": (1720, 720),
-            # UWFHD
-            "2560x1080 (UWFHD)": (2560, 1080),
-            # UWQHD
-            "3440x1440 (UWQHD)": (3440, 1440),
-            # Wide 4K
-            "3840x1600 (Wide 4K)": (3840, 1600),
-            # 5K UW
-            "5120x2160 (5K UW)": (5120, 2160),
-        },
-        "9:16 (Portrait Mobile)": {
-            # Basic
-            "360x640": (360, 640),
-            # 480p
-            "480x854 (480p)": (480, 854),
-            # 720p HD
-            "720x1280 (720p HD)": (720, 1280),
-            # SDXL optimized 9:16
-            "768x1344 (SDXL)": (768, 1344),
-            # Qwen-Image 9:16
-            "928x1664 (Qwen-Image)": (928, 1664),
-            # DALL-E 3 portrait
-            "1024x1792 (DALL-E 3)": (1024, 1792),
-            # 1080p FHD
-            "1080x1920 (1080p FHD)": (1080, 1920),
-            # 2K
-            "1440x2560 (1440p 2K)": (1440, 2560),
-            # 4K
-            "2160x3840 (4K)": (2160, 3840),
-        },
-        "3:4 (Portrait Standard)": {
-            # VGA
-            "480x640 (VGA)": (480, 640),
-            # SVGA
-            "600x800 (SVGA)": (600, 800),
-            # XGA
-            "768x1024 (XGA)": (768, 1024),
-            # SDXL optimized ~7:9
-            "896x1152 (SDXL ~7:9)": (896, 1152),
-            # SXGA
-            "960x1280 (SXGA)": (960, 1280),
-            # Qwen-Image 3:4
-            "1104x1472 (Qwen-Image)": (1104, 1472),
-            # UXGA
-            "1200x1600 (UXGA)": (1200, 1600),
-            # 2K
-            "1536x2048 (2K)": (1536, 2048),
-            # 4K
-            "3072x4096 (4K)": (3072, 4096),
-        },
-        "2:3 (Portrait Photo)": {
-            # SD 1.5
-            "512x768 (SD1.5)": (512, 768),
-            # Basic
-            "480x720": (480, 720),
-            # Basic HD
-            "720x1080": (720, 1080),
-            # SDXL optimized 2:3
-            "832x1216 (SDXL)": (832, 1216),
-            # HD
-            "960x1440": (960, 1440),
-            # Qwen-Image 2:3
-            "1056x1584 (Qwen-Image)": (1056, 1584),
-            # FHD
-            "1080x1620 (FHD)": (1080, 1620),
-            # 2K
-            "1440x2160 (2K)": (1440, 2160),
-            # 3K
-            "2000x3000 (3K)": (2000, 3000),
-            # 4K
-            "2880x4320 (4K)": (2880, 4320),
-        },
-    }
+    # Frozen view of the table (read-only, shared by all instances)
+    RESOLUTIONS = MappingProxyType({
+        aspect: MappingProxyType(resolutions) for aspect, resolutions in _RESOLUTIONS.items()
+    })
+
+    # Resolution names per aspect ratio, in display order
+    RESOLUTION_CHOICES = MappingProxyType({
+        aspect: tuple(resolutions) for aspect, resolutions in _RESOLUTIONS.items()
+    })
+
+    # All resolution options for all aspect ratios (combo inputs must be lists)
+    ALL_RESOLUTIONS = [name for choices in RESOLUTION_CHOICES.values() for name in choices]
+
+    # Resolution name -> (width, height, aspect)
+    RESOLUTION_INDEX = MappingProxyType(_build_resolution_index(_RESOLUTIONS))
+
+    # Returned when neither the aspect ratio nor the resolution is known
+    DEFAULT_RESOLUTION = (1024, 1024, "1:1 (Square)")
 
     @classmethod
     def INPUT_TYPES(cls):
-        # Get all resolution options for all aspect ratios
-        all_resolutions = []
-        for aspect, resolutions in cls.RESOLUTIONS.items():
-            all_resolutions.extend(list(resolutions.keys()))
-
         return {
             "required": {
                 "aspect_ratio": (cls.ASPECT_RATIOS, {"default": "16:9 (Widescreen)"}),
-                "resolution": (all_resolutions, {"default": "1920x1080 (1080p FHD)"}),
+                "resolution": (cls.ALL_RESOLUTIONS, {"default": "1920x1080 (1080p FHD)"}),
             },
         }
 
@@ -1001,18 +1463,12 @@ class ResolutionPicker:
                 return (width, height, aspect_ratio)
             else:
                 # Resolution not in this aspect - use first one
-                first_res = list(resolutions.keys())[0]
+                first_res = self.RESOLUTION_CHOICES[aspect_ratio][0]
                 width, height = resolutions[first_res]
                 return (width, height, aspect_ratio)
 
-        # Fallback: search all aspect ratios (should not reach here normally)
-        for aspect, resolutions in self.RESOLUTIONS.items():
-            if resolution in resolutions:
-                width, height = resolutions[resolution]
-                return (width, height, aspect)
-
-        # Ultimate fallback
-        return (1024, 1024, "1:1 (Square)")
+        # Fallback: look up across all aspect ratios (should not reach here normally)
+        return self.RESOLUTION_INDEX.get(resolution, self.DEFAULT_RESOLUTION)
 
 
 class WorkflowMetadata:
@@ -1027,6 +1483,9 @@ class WorkflowMetadata:
     def INPUT_TYPES(cls):
         return {
             "required": {},
+            "optional": {
+                "pretty": ("BOOLEAN", {"default": True, "tooltip": "Indent JSON (off = compact, smaller and faster)"}),
+            },
             "hidden": {
                 "prompt": "PROMPT",
                 "extra_pnginfo": "EXTRA_PNGINFO",
@@ -1038,15 +1497,16 @@ class WorkflowMetadata:
     FUNCTION = "get_metadata"
     CATEGORY = "ComfyAngel/Utility"
 
-    def get_metadata(self, prompt=None, extra_pnginfo=None):
+    def get_metadata(self, prompt=None, extra_pnginfo=None, pretty: bool = True):
         prompt_json = ""
         workflow_json = ""
 
         if prompt is not None:
-            prompt_json = json.dumps(prompt, indent=2)
+            prompt_json = dumps_json(prompt, pretty)
 
-        if extra_pnginfo is not None and "workflow" in extra_pnginfo:
-            workflow_json = json.dumps(extra_pnginfo["workflow"], indent=2)
+        workflow = None if extra_pnginfo is None else extra_pnginfo.get("workflow")
+        if workflow is not None:
+            workflow_json = dumps_json(workflow, pretty)
 
         return (prompt_json, workflow_json)
 
@@ -1071,6 +1531,17 @@ class TextCombine:
         "custom",
     ]
 
+    # Preset -> delimiter string ("custom" comes from custom_delimiter)
+    DELIMITER_MAP = {
+        "newline": "\n",
+        "space": " ",
+        "comma": ",",
+        "comma_space": ", ",
+        "pipe": " | ",
+        "tab": "\t",
+        "none": "",
+    }
+
     @classmethod
     def INPUT_TYPES(cls):
         # Use "*" to accept any type
@@ -1093,6 +1564,7 @@ class TextCombine:
                 "custom_delimiter": ("STRING", {"default": " | "}),
                 "skip_empty": ("BOOLEAN", {"default": True}),
                 "trim_whitespace": ("BOOLEAN", {"default": True}),
+                "show_preview": ("BOOLEAN", {"default": True, "tooltip": "Show the combined text on the node"}),
             },
         }
 
@@ -1118,42 +1590,49 @@ class TextCombine:
         custom_delimiter: str = " | ",
         skip_empty: bool = True,
         trim_whitespace: bool = True,
+        show_preview: bool = True,
     ):
         # Get delimiter string
-        delim_map = {
-            "newline": "\n",
-            "space": " ",
-            "comma": ",",
-            "comma_space": ", ",
-            "pipe": " | ",
-            "tab": "\t",
-            "none": "",
-            "custom": custom_delimiter,
-        }
-        delim = delim_map.get(delimiter, "\n")
-
-        # Collect all inputs
-        inputs = [input_1, input_2, input_3, input_4, input_5, input_6, input_7, input_8, input_9, input_10]
-
-        # Process inputs
-        processed = []
+        if delimiter == "custom":
+            delim = custom_delimiter
+        else:
+            delim = self.DELIMITER_MAP.get(delimiter, "\n")
+
+        # Collect connected inputs and convert to string
+        inputs = (input_1, input_2, input_3, input_4, input_5, input_6, input_7, input_8, input_9, input_10)
+        texts = []
+        append = texts.append
+        to_string = self._to_string
+        seen = {}  # id(value) -> text, so an object wired into several inputs is converted once
         for value in inputs:
             if value is None:
                 continue
-
-            # Convert to string
-            text = self._to_string(value)
-
-            if trim_whitespace:
-                text = text.strip()
-            if skip_empty and not text:
+            if type(value) is str:
+                append(value)
                 continue
-            processed.append(text)
+            text = seen.get(id(value))
+            if text is None:
+                text = to_string(value)
+                seen[id(value)] = text
+            append(text)
+
+        # Process inputs (branch once on the flags, not per item)
+        if trim_whitespace and skip_empty:
+            processed = [stripped for stripped in map(str.strip, texts) if stripped]
+        elif trim_whitespace:
+            processed = [text.strip() for text in texts]
+        elif skip_empty:
+            processed = [text for text in texts if text]
+        else:
+            processed = texts
 
         # Combine
         result = delim.join(processed)
         count = len(processed)
 
+        if not show_preview:
+            return (result, count)
+
         # Return with UI preview
         return {
             "ui": {"text": [result]},
@@ -1162,59 +1641,43 @@ class TextCombine:
 
     def _to_string(self, value) -> str:
         """Convert any value to string."""
-        import torch
+        # Most inputs are already strings from prompt nodes
+        if type(value) is str:
+            return value
 
+        # Exact type match covers almost every input; subclasses take the slow path
+        formatter = self._FORMATTERS.get(type(value))
+        if formatter is not None:
+            return formatter(self, value)
+        return self._to_string_slow(value)
+
+    def _to_string_slow(self, value) -> str:
+        """isinstance-based conversion for subclasses and unknown types."""
         # Already string
         if isinstance(value, str):
             return value
 
         # Boolean
         if isinstance(value, bool):
-            return "true" if value else "false"
+            return self._format_bool(value)
 
         # Numbers
         if isinstance(value, int):
             return str(value)
         if isinstance(value, float):
-            # Format nicely, remove trailing zeros
-            if value == int(value):
-                return str(int(value))
-            return f"{value:.6g}"
+            return self._format_float(value)
 
         # Torch tensor
         if isinstance(value, torch.Tensor):
-            shape = list(value.shape)
-            dtype = str(value.dtype).replace("torch.", "")
-            if value.numel() == 1:
-                # Single value tensor
-                return f"{value.item():.6g}"
-            elif len(shape) == 4:
-                # Image tensor (B, H, W, C) or (B, C, H, W)
-                return f"Tensor[{shape[0]}x{shape[1]}x{shape[2]}x{shape[3]}] {dtype}"
-            else:
-                return f"Tensor{shape} {dtype}"
+            return self._format_tensor(value)
 
         # List or tuple
         if isinstance(value, (list, tuple)):
-            if len(value) == 0:
-                return ""
-            # If all items are simple, join them
-            if all(isinstance(v, (str, int, float, bool)) for v in value):
-                return ", ".join(self._to_string(v) for v in value)
-            return f"[{len(value)} items]"
+            return self._format_sequence(value)
 
         # Dict
         if isinstance(value, dict):
-            if len(value) == 0:
-                return ""
-            # Try to format as key=value pairs
-            try:
-                parts = [f"{k}={self._to_string(v)}" for k, v in list(value.items())[:5]]
-                if len(value) > 5:
-                    parts.append(f"...+{len(value)-5} more")
-                return "{" + ", ".join(parts) + "}"
-            except Exception:
-                return f"{{dict: {len(value)} keys}}"
+            return self._format_dict(value)
 
         # None
         if value is None:
@@ -1226,6 +1689,60 @@ class TextCombine:
         except Exception:
             return f"<{type(value).__name__}>"
 
+    def _format_bool(self, value: bool) -> str:
+        return "true" if value else "false"
+
+    def _format_float(self, value: float) -> str:
+        # Format nicely, remove trailing zeros (inf/nan are not integers and format as-is)
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.6g}"
+
+    def _format_tensor(self, value: torch.Tensor) -> str:
+        shape = list(value.shape)
+        dtype = str(value.dtype).replace("torch.", "")
+        if value.numel() == 1:
+            # Single value tensor
+            return f"{value.item():.6g}"
+        elif len(shape) == 4:
+            # Image tensor (B, H, W, C) or (B, C, H, W)
+            return f"Tensor[{shape[0]}x{shape[1]}x{shape[2]}x{shape[3]}] {dtype}"
+        else:
+            return f"Tensor{shape} {dtype}"
+
+    def _format_sequence(self, value) -> str:
+        if len(value) == 0:
+            return ""
+        # If all items are simple, join them
+        if all(isinstance(v, (str, int, float, bool)) for v in value):
+            return ", ".join(self._to_string(v) for v in value)
+        return f"[{len(value)} items]"
+
+    def _format_dict(self, value: dict) -> str:
+        if len(value) == 0:
+            return ""
+        # Try to format as key=value pairs
+        try:
+            parts = [f"{k}={self._to_string(v)}" for k, v in list(value.items())[:5]]
+            if len(value) > 5:
+                parts.append(f"...+{len(value)-5} more")
+            return "{" + ", ".join(parts) + "}"
+        except Exception:
+            return f"{{dict: {len(value)} keys}}"
+
+    # Exact type -> formatter (called with self)
+    _FORMATTERS = {
+        str: lambda self, value: value,
+        bool: _format_bool,
+        int: lambda self, value: str(value),
+        float: _format_float,
+        torch.Tensor: _format_tensor,
+        list: _format_sequence,
+        tuple: _format_sequence,
+        dict: _format_dict,
+        type(None): lambda self, value: "",
+    }
+
 
 class TextPermutation:
     """
@@ -1251,6 +1768,9 @@ class TextPermutation:
         "space": " ",
     }
 
+    # Matches one {option1,option2,...} group
+    GROUP_PATTERN = re.compile(r'\{([^{}]+)\}')
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -1264,6 +1784,8 @@ class TextPermutation:
                 "separator": ("STRING", {"default": ","}),
                 "output_delimiter": (cls.OUTPUT_DELIMITER_OPTIONS, {"default": "newline"}),
                 "trim_options": ("BOOLEAN", {"default": True}),
+                "max_results": ("INT", {"default": 10000, "min": 1, "max": 1000000,
+                                        "tooltip": "Stop after this many combinations"}),
             },
         }
 
@@ -1273,13 +1795,20 @@ class TextPermutation:
     FUNCTION = "generate"
     CATEGORY = "ComfyAngel/Utility"
 
-    def generate(self, template: str, separator: str = ",", output_delimiter: str = "newline", trim_options: bool = True):
-        import re
-        from itertools import product
+    def generate(
+        self,
+        template: str,
+        separator: str = ",",
+        output_delimiter: str = "newline",
+        trim_options: bool = True,
+        max_results: int = 10000,
+    ):
+        # No brace at all: nothing to expand, skip the regex scan
+        if "{" not in template:
+            return ([template], template, 1)
 
         # Find all {option1,option2,...} groups
-        pattern = r'\{([^{}]+)\}'
-        matches = list(re.finditer(pattern, template))
+        matches = list(self.GROUP_PATTERN.finditer(template))
 
         if not matches:
             # No groups found, return template as-is
@@ -1294,22 +1823,25 @@ class TextPermutation:
                 options = [opt.strip() for opt in options]
             groups.append(options)
 
-        # Generate all combinations
-        combinations = list(product(*groups))
+        # Generate combinations lazily, capped at max_results to bound memory
+        combinations = islice(product(*groups), max(1, max_results))
 
-        # Prevent memory explosion
-        MAX_COMBINATIONS = 10000
-        if len(combinations) > MAX_COMBINATIONS:
-            raise ValueError(f"Too many combinations ({len(combinations)}). Maximum allowed: {MAX_COMBINATIONS}")
+        # Split the template once: literal text at even slots, options at odd slots
+        parts = []
+        last = 0
+        for match in matches:
+            parts.append(template[last:match.start()])
+            parts.append(None)
+            last = match.end()
+        parts.append(template[last:])
 
-        # Build result strings
+        # Build result strings in one pass: drop each combination into the option slots
         results = []
+        append = results.append
+        join = "".join
         for combo in combinations:
-            result = template
-            # Replace each group with corresponding option
-            for match, option in zip(matches, combo):
-                result = result.replace(match.group(0), option, 1)
-            results.append(result)
+            parts[1::2] = combo
+            append(join(parts))
 
         # Create combined output
         delim = self.OUTPUT_DELIMITER_MAP.get(output_delimiter, "\n")
@@ -1338,6 +1870,11 @@ class JSONExtract:
         "semicolon": ";",
     }
 
+    # Field path patterns
+    DOT_SPLIT_PATTERN = re.compile(r'\.(?![^\[]*\])')  # Dots outside brackets
+    INDEX_PATTERN = re.compile(r'^([^\[]*)\[(\d+)\](.*)$')  # "items[0]..." or "[0]..."
+    CHAINED_INDEX_PATTERN = re.compile(r'^\[(\d+)\](.*)$')  # "[1]..." after an index
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -1372,14 +1909,17 @@ class JSONExtract:
         Parse field path into list of keys/indices.
         "data.users[0].name" -> ["data", "users", 0, "name"]
         """
-        import re
+        # No index brackets: plain dotted path, no regex needed
+        if "]" not in path:
+            return [token for token in path.split(".") if token]
+
         parts = []
         # Split by dots, but handle array brackets
-        tokens = re.split(r'\.(?![^\[]*\])', path)
+        tokens = self.DOT_SPLIT_PATTERN.split(path)
 
         for token in tokens:
             # Check for array index: "items[0]" or just "[0]"
-            match = re.match(r'^([^\[]*)\[(\d+)\](.*)$', token)
+            match = self.INDEX_PATTERN.match(token)
             if match:
                 key, index, rest = match.groups()
                 if key:
@@ -1387,7 +1927,7 @@ class JSONExtract:
                 parts.append(int(index))
                 # Handle chained brackets like [0][1]
                 while rest:
-                    match = re.match(r'^\[(\d+)\](.*)$', rest)
+                    match = self.CHAINED_INDEX_PATTERN.match(rest)
                     if match:
                         index, rest = match.groups()
                         parts.append(int(index))
@@ -1444,7 +1984,7 @@ class JSONExtract:
             return {"ui": {"json_cache": [""]}, "result": ([], "", 0)}
 
         try:
-            data = json.loads(json_string)
+            data = _loads_json_cached(json_string)
         except json.JSONDecodeError as e:
             # Return error message as single value
             return {"ui": {"json_cache": [json_string]}, "result": ([f"JSON Error: {e}"], f"JSON Error: {e}", 1)}
@@ -0,0 +1,75 @@
+"""
+The A1111 parameters-line scanner against the regex it replaced.
+
+Run from the repo root: python -m pytest tests
+"""
+
+import importlib.util
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# The pattern _iter_a1111_pairs replaced, as the old parser used it
+OLD_PAIR_RE = re.compile(r'([^:,]+):\s*([^,]+(?:,\s*[^:,]+)*?)(?=,\s*[^:,]+:|$)')
+
+
+def _load_metadata_parser():
+    """Import the repo as a package (its folder name isn't a valid module name)."""
+    if "comfyangel" not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            "comfyangel", REPO_ROOT / "__init__.py", submodule_search_locations=[str(REPO_ROOT)]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["comfyangel"] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module("comfyangel.utils.metadata_parser")
+
+
+metadata_parser = _load_metadata_parser()
+
+
+def _stripped(pairs):
+    return [(key.strip(), value.strip()) for key, value in pairs]
+
+
+def _assert_matches_regex(line):
+    expected = _stripped(OLD_PAIR_RE.findall(line))
+    assert _stripped(metadata_parser._iter_a1111_pairs(line)) == expected
+
+
+@pytest.mark.parametrize("line", [
+    "Steps: 20, Sampler: Euler a, CFG scale: 7, Seed: 12345, Size: 512x768",
+    "Steps: 30, Size: 512, 768, Model: sd15",
+    "Size: 512, 768",
+    "Lora hashes: \"a: 1, b: 2\", Version: v1.6.0",
+    "Steps:20,Sampler:DPM++ 2M Karras",
+    "  Steps:   20 ,  CFG scale :  7  ",
+    "no pairs here",
+    "",
+    ", , :,",
+    "Key: value:with:colons, Next: 1",
+])
+def test_matches_old_regex(line):
+    _assert_matches_regex(line)
+
+
+def test_size_continuation_stays_whole():
+    pairs = _stripped(metadata_parser._iter_a1111_pairs("Steps: 30, Size: 512, 768, Model: sd15"))
+    assert pairs == [("Steps", "30"), ("Size", "512, 768"), ("Model", "sd15")]
+
+
+def test_raw_values_keep_leading_whitespace():
+    # Only the stripped pairs match the regex; the caller strips
+    assert list(metadata_parser._iter_a1111_pairs("Steps:  20")) == [("Steps", "  20")]
+
+
+def test_matches_old_regex_fuzz():
+    rng = random.Random(1234)
+    alphabet = "ab :, \t"
+    for _ in range(5000):
+        _assert_matches_regex("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24))))
@@ -0,0 +1,76 @@
+"""
+Parity between the torch and PIL compositing paths of Smart Composite XY.
+
+Run from the repo root: python -m pytest tests
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# The torch path skips the PIL path's 8-bit rounding steps (~4 levels worst case)
+MAX_LEVEL_DIFF = 5
+
+
+def _load_widget_nodes():
+    """Import the repo as a package (its folder name isn't a valid module name)."""
+    if "comfyangel" not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            "comfyangel", REPO_ROOT / "__init__.py", submodule_search_locations=[str(REPO_ROOT)]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["comfyangel"] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module("comfyangel.nodes.widget_nodes")
+
+
+widget_nodes = _load_widget_nodes()
+BLEND_MODES = widget_nodes.SmartCompositeXY.BLEND_MODES
+
+
+def _composite_both(canvas, overlay, blend_mode, opacity, mask):
+    node = widget_nodes.SmartCompositeXY()
+    kwargs = dict(
+        quick_position="free", x=5, y=7, anchor="top_left",
+        blend_mode=blend_mode, opacity=opacity, mask=mask,
+    )
+    # scale 100% takes the torch path; a same-size "scale" forces the PIL path
+    tensor_out = node.composite(canvas, overlay, scale_percent=100.0, **kwargs)[0]
+    pil_out = node.composite(canvas, overlay, scale_percent=100.0001, **kwargs)[0]
+    return tensor_out, pil_out
+
+
+@pytest.mark.parametrize("blend_mode", BLEND_MODES)
+@pytest.mark.parametrize("channels,use_mask,opacity", [
+    (3, False, 100.0),
+    (3, False, 60.0),
+    (4, False, 100.0),
+    (3, True, 100.0),
+    (4, True, 60.0),
+])
+def test_tensor_path_matches_pil_path(blend_mode, channels, use_mask, opacity):
+    generator = torch.Generator().manual_seed(0)
+    canvas = torch.rand(2, 40, 50, 3, generator=generator)
+    overlay = torch.rand(2, 17, 13, channels, generator=generator)
+    mask = torch.rand(2, 17, 13, generator=generator) if use_mask else None
+
+    tensor_out, pil_out = _composite_both(canvas, overlay, blend_mode, opacity, mask)
+
+    assert tensor_out.shape == pil_out.shape
+    assert (tensor_out - pil_out).abs().max().item() * 255 <= MAX_LEVEL_DIFF
+
+
+@pytest.mark.parametrize("dtype", [torch.float16, torch.bfloat16])
+def test_tensor_path_returns_float32(dtype):
+    generator = torch.Generator().manual_seed(1)
+    canvas = torch.rand(1, 24, 24, 3, generator=generator).to(dtype)
+    overlay = torch.rand(1, 8, 8, 4, generator=generator).to(dtype)
+
+    tensor_out, pil_out = _composite_both(canvas, overlay, "multiply", 80.0, None)
+
+    assert tensor_out.dtype == pil_out.dtype == torch.float32
@@ -0,0 +1,91 @@
+"""
+The PNG text-chunk reader against PIL's Image.info.
+
+Run from the repo root: python -m pytest tests
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_metadata_parser():
+    """Import the repo as a package (its folder name isn't a valid module name)."""
+    if "comfyangel" not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            "comfyangel", REPO_ROOT / "__init__.py", submodule_search_locations=[str(REPO_ROOT)]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["comfyangel"] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module("comfyangel.utils.metadata_parser")
+
+
+metadata_parser = _load_metadata_parser()
+
+PARAMETERS = "a cat, ñ\nSteps: 20, Sampler: Euler a, Size: 512, 768"
+PROMPT = '{"3": {"class_type": "KSampler", "inputs": {"seed": 1}}}'
+WORKFLOW = '{"nodes": [], "extra": {"title": "日本語 ✓"}}'
+
+
+def _save_png(path, add_chunks):
+    info = PngInfo()
+    add_chunks(info)
+    info.add_text("Software", "ignored")  # not a metadata key, must be skipped
+    Image.new("RGB", (4, 4), (10, 20, 30)).save(path, pnginfo=info)
+    return path
+
+
+def _assert_matches_pil(path):
+    texts = metadata_parser._read_png_text_chunks(str(path))
+    with Image.open(path) as img:
+        expected = {k: str(v) for k, v in img.info.items() if k in ("parameters", "prompt", "workflow")}
+    assert texts == expected
+    return texts
+
+
+@pytest.mark.parametrize("chunk", ["tEXt", "zTXt", "iTXt", "iTXt compressed"])
+def test_matches_pil_info(tmp_path, chunk):
+    def add_chunks(info):
+        if chunk == "tEXt":
+            # tEXt is Latin-1 only
+            info.add_text("parameters", PARAMETERS, zip=False)
+            info.add_text("prompt", PROMPT, zip=False)
+        elif chunk == "zTXt":
+            info.add_text("parameters", PARAMETERS, zip=True)
+            info.add_text("prompt", PROMPT, zip=True)
+        else:
+            zip_ = chunk == "iTXt compressed"
+            info.add_itxt("parameters", PARAMETERS, lang="en", tkey="Parameter", zip=zip_)
+            info.add_itxt("workflow", WORKFLOW, zip=zip_)
+
+    texts = _assert_matches_pil(_save_png(tmp_path / "meta.png", add_chunks))
+    assert texts["parameters"] == PARAMETERS
+
+
+def test_mixed_chunk_types(tmp_path):
+    def add_chunks(info):
+        info.add_text("parameters", PARAMETERS)
+        info.add_text("prompt", PROMPT, zip=True)
+        info.add_itxt("workflow", WORKFLOW, zip=True)
+
+    texts = _assert_matches_pil(_save_png(tmp_path / "mixed.png", add_chunks))
+    assert texts == {"parameters": PARAMETERS, "prompt": PROMPT, "workflow": WORKFLOW}
+
+
+def test_png_without_text(tmp_path):
+    path = tmp_path / "plain.png"
+    Image.new("RGB", (4, 4)).save(path)
+    assert metadata_parser._read_png_text_chunks(str(path)) == {}
+
+
+def test_non_png_returns_none(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (4, 4)).save(path)
+    assert metadata_parser._read_png_text_chunks(str(path)) is None
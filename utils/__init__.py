@@ -1,8 +1,10 @@
 # ComfyAngel Utilities
 from .tensor_ops import ensure_bhwc, to_pil, from_pil, clone_tensor
 from .metadata_parser import read_image_metadata, GenerationParams
-from .text_renderer import TextRenderer
-from .color_utils import hex_to_rgb, rgb_to_hex
+from .text_renderer import TextRenderer, get_default_renderer
+from .color_utils import hex_to_rgb, normalize_hex, rgb_to_hex
+from .buffer_pool import acquire_buffer, release_buffer
+from .json_utils import dumps_json, loads_json
 from .loop_utils import (
     AlwaysEqualProxy,
     ByPassTypeTuple,
@@ -10,4 +12,6 @@ from .loop_utils import (
     get_items_length,
     get_item_at_index,
     accumulate_results,
+    finalize_results,
+    TensorAccumulator,
 )
@@ -0,0 +1,81 @@
+"""
+Reusable NumPy buffers for ComfyAngel hot paths.
+
+Composite nodes allocate scratch arrays with the same shape for every
+image in a batch. This keeps a small per-thread pool so those arrays
+are recycled instead of hitting the allocator each time.
+"""
+
+import threading
+import numpy as np
+
+# Max buffers kept per (shape, dtype) bucket
+MAX_PER_BUCKET = 8
+# Max bytes kept per thread across all buckets; least recently used
+# buckets are dropped first (region shapes change as overlays move)
+MAX_POOL_BYTES = 64 * 1024 * 1024
+
+_local = threading.local()
+
+
+def _get_pool() -> dict:
+    """Per-thread pool: (shape, dtype) -> free buffers, least recently used first."""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = {}
+        _local.pool = pool
+        _local.nbytes = 0
+    return pool
+
+
+def acquire_buffer(shape: tuple, dtype=np.uint8) -> np.ndarray:
+    """
+    Get an uninitialized array of the given shape and dtype.
+
+    Args:
+        shape: Array shape
+        dtype: NumPy dtype
+
+    Returns:
+        Array from the pool, or a new one if none is free
+    """
+    key = (tuple(shape), np.dtype(dtype).str)
+    pool = _get_pool()
+    bucket = pool.get(key)
+    if bucket:
+        buffer = bucket.pop()
+        _local.nbytes -= buffer.nbytes
+        if not bucket:
+            del pool[key]
+        return buffer
+    return np.empty(shape, dtype=dtype)
+
+
+def release_buffer(buffer: np.ndarray) -> None:
+    """
+    Return an array to the pool for reuse.
+
+    The caller must not keep references to the buffer afterwards.
+
+    Args:
+        buffer: Array previously obtained from acquire_buffer
+    """
+    if buffer.nbytes > MAX_POOL_BYTES:
+        return
+    key = (buffer.shape, buffer.dtype.str)
+    pool = _get_pool()
+    # Re-insert the bucket so dict order tracks recency
+    bucket = pool.pop(key, [])
+    pool[key] = bucket
+    if len(bucket) >= MAX_PER_BUCKET:
+        return
+    bucket.append(buffer)
+    _local.nbytes += buffer.nbytes
+
+    # Over budget: drop buffers from the least recently used buckets
+    while _local.nbytes > MAX_POOL_BYTES:
+        oldest_key = next(iter(pool))
+        oldest = pool[oldest_key]
+        _local.nbytes -= oldest.pop().nbytes
+        if not oldest:
+            del pool[oldest_key]
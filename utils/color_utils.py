@@ -4,11 +4,17 @@ Color utilities for ComfyAngel nodes.
 Shared functions for hex color conversion.
 """
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=256)
 def hex_to_rgb(hex_color: str, default: tuple[int, int, int] = (255, 255, 255)) -> tuple[int, int, int]:
     """
     Convert hex color (#FFFFFF or #FFF) to RGB tuple.
 
+    Results are cached since nodes re-parse the same widget colors on
+    every execution.
+
     Args:
         hex_color: Hex color string (with or without #)
         default: Default color if parsing fails
@@ -22,14 +28,38 @@ def hex_to_rgb(hex_color: str, default: tuple[int, int, int] = (255, 255, 255))
     if len(hex_color) == 3:
         hex_color = "".join([c * 2 for c in hex_color])
 
-    # Validate length
-    if len(hex_color) != 6:
-        return default
-
+    # Decode byte pairs in C; anything but exactly 3 bytes is invalid
     try:
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        rgb = bytes.fromhex(hex_color)
     except ValueError:
         return default
+    if len(rgb) != 3 or len(hex_color) != 6:
+        return default
+
+    return tuple(rgb)
+
+
+@lru_cache(maxsize=256)
+def normalize_hex(hex_color: str) -> str:
+    """
+    Normalize a hex color string to uppercase #RRGGBB.
+
+    Args:
+        hex_color: Hex color string (with or without #, #FFF shorthand allowed)
+
+    Returns:
+        Normalized hex string, or #FFFFFF if the length is invalid
+    """
+    hex_color = hex_color.strip()
+    if not hex_color.startswith("#"):
+        hex_color = "#" + hex_color
+    # Expand shorthand (#FFF -> #FFFFFF)
+    if len(hex_color) == 4:
+        hex_color = "#" + "".join([c * 2 for c in hex_color[1:]])
+    # Validate format
+    if len(hex_color) != 7:
+        hex_color = "#FFFFFF"
+    return hex_color.upper()
 
 
 def rgb_to_hex(rgb: tuple[int, int, int]) -> str:
@@ -0,0 +1,51 @@
+"""
+JSON utilities for ComfyAngel nodes.
+
+Shared orjson-backed encode/decode helpers with a stdlib json fallback.
+"""
+
+import json
+
+# Optional: faster JSON encoder/decoder (falls back to stdlib json if unavailable)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps_json(obj, pretty: bool = True) -> str:
+    """
+    Serialize to JSON, indented by 2 if pretty, else compact.
+
+    Pretty output always comes from stdlib json, so it doesn't depend on
+    orjson being installed. Compact output uses orjson when available, which
+    writes non-ASCII as UTF-8 and formats some floats differently
+    (1e-05 -> 0.00001, 1e+20 -> 1e20); the parsed values are the same.
+
+    Values JSON can't represent (e.g. objects left in a prompt) are written via str().
+    """
+    if pretty:
+        return json.dumps(obj, indent=2, default=str)
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # Not serializable by orjson (e.g. big ints) - use stdlib
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def loads_json(text: str):
+    """
+    Parse JSON, with orjson when available.
+
+    Input orjson rejects (invalid JSON, NaN/Infinity literals) is re-parsed
+    by stdlib json, so accepted input and error messages match json.loads.
+    Some orjson versions decode integers wider than 64 bits as floats.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
@@ -30,9 +30,16 @@ class ByPassTypeTuple(tuple):
     Tuple that bypasses type checking by always returning first element.
     Used for dynamic return types in loop nodes.
     """
+    def __new__(cls, iterable=()):
+        self = super().__new__(cls, iterable)
+        # Wrap the first element once; every non-negative index returns it
+        first = tuple.__getitem__(self, 0) if len(self) else None
+        self._first = TautologyStr(first) if isinstance(first, str) else first
+        return self
+
     def __getitem__(self, index):
-        if index > 0:
-            index = 0
+        if index >= 0 and len(self):
+            return self._first
         item = super().__getitem__(index)
         if isinstance(item, str):
             return TautologyStr(item)
@@ -43,6 +50,49 @@ class ByPassTypeTuple(tuple):
 any_type = AlwaysEqualProxy("*")
 
 
+def _tensor_length(items) -> int:
+    # For tensors, first dimension is batch size
+    return items.shape[0] if items.dim() > 0 else 1
+
+
+def _tensor_item(items, index: int):
+    if items.dim() == 0:
+        return items
+    # Return single item from batch, keeping dimensions
+    return items[index:index+1]
+
+
+def _sequence_item(items, index: int):
+    if len(items) == 0:
+        return None
+    return items[index]
+
+
+# Exact-type handlers, looked up once per call on the loop hot path
+_LEN_DISPATCH = {
+    torch.Tensor: _tensor_length,
+    list: len,
+    tuple: len,
+}
+
+_ITEM_DISPATCH = {
+    torch.Tensor: _tensor_item,
+    list: _sequence_item,
+    tuple: _sequence_item,
+}
+
+
+def _resolve_handler(items, table: dict):
+    """Find a handler for items, falling back to isinstance for subclasses."""
+    handler = table.get(type(items))
+    if handler is None:
+        if isinstance(items, torch.Tensor):
+            handler = table[torch.Tensor]
+        elif isinstance(items, (list, tuple)):
+            handler = table[list]
+    return handler
+
+
 def get_items_length(items) -> int:
     """
     Get the length of items regardless of type.
@@ -51,12 +101,9 @@ def get_items_length(items) -> int:
     if items is None:
         return 0
 
-    if isinstance(items, torch.Tensor):
-        # For tensors, first dimension is batch size
-        return items.shape[0] if items.dim() > 0 else 1
-
-    if isinstance(items, (list, tuple)):
-        return len(items)
+    handler = _resolve_handler(items, _LEN_DISPATCH)
+    if handler is not None:
+        return handler(items)
 
     # Single item
     return 1
@@ -70,30 +117,89 @@ def get_item_at_index(items, index: int):
     if items is None:
         return None
 
-    if isinstance(items, torch.Tensor):
-        if items.dim() == 0:
-            return items
-        # Return single item from batch, keeping dimensions
-        return items[index:index+1]
-
-    if isinstance(items, (list, tuple)):
-        if len(items) == 0:
-            return None
-        return items[index]
+    handler = _resolve_handler(items, _ITEM_DISPATCH)
+    if handler is not None:
+        return handler(items, index)
 
     # Single item - return as-is
     return items
 
 
-def accumulate_results(existing, new_item):
+class TensorAccumulator:
+    """
+    Deferred batch of tensors produced by a loop.
+
+    Concatenating on every iteration copies the whole batch each time
+    (O(N^2) for N iterations). This keeps the chunks and concatenates
+    once in finalize_results(). Instances are never mutated, since
+    ComfyUI may hand the same cached output to a later execution.
+    """
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def fits(self, item: torch.Tensor) -> bool:
+        first = self.chunks[0]
+        return item.dim() == first.dim() and item.shape[1:] == first.shape[1:]
+
+    def append(self, item: torch.Tensor) -> "TensorAccumulator":
+        return TensorAccumulator(self.chunks + [item])
+
+    def finalize(self) -> torch.Tensor:
+        if len(self.chunks) == 1:
+            return self.chunks[0].clone()
+        return torch.cat(self.chunks, dim=0)
+
+
+def finalize_results(results):
+    """
+    Turn accumulated loop results into their final value.
+    Deferred tensor batches are concatenated; anything else is returned as-is.
+    """
+    if isinstance(results, TensorAccumulator):
+        return results.finalize()
+    return results
+
+
+def _accumulate_deferred(existing, new_item: torch.Tensor):
+    """Add a tensor to a deferred batch, or None if it can't be deferred."""
+    if existing is None:
+        if new_item.dim() == 0:
+            return None
+        return TensorAccumulator([new_item])
+
+    if not isinstance(existing, TensorAccumulator):
+        return None
+
+    # Same dim promotion as the eager path: (H, W, C) joins a 4-dim batch
+    if new_item.dim() == 3 and existing.chunks[0].dim() == 4:
+        new_item = new_item.unsqueeze(0)
+    if existing.fits(new_item):
+        return existing.append(new_item)
+    return None
+
+
+def accumulate_results(existing, new_item, defer: bool = False):
     """
     Accumulate results into a batch.
     For tensors (IMAGE, MASK, LATENT): concatenates along batch dimension.
     For other types (strings, etc.): creates a list.
+
+    With defer=True, matching tensors are collected in a TensorAccumulator
+    and concatenated once by finalize_results() when the loop ends.
     """
     if new_item is None:
         return existing
 
+    if defer and isinstance(new_item, torch.Tensor):
+        deferred = _accumulate_deferred(existing, new_item)
+        if deferred is not None:
+            return deferred
+
+    # Shape changed or non-tensor item - continue eagerly from here
+    existing = finalize_results(existing)
+
     if existing is None:
         # First item - clone tensor or wrap in list
         if isinstance(new_item, torch.Tensor):
@@ -6,10 +6,41 @@ Extracts generation parameters from PNG metadata:
 """
 
 import json
+import os
 import re
+import zlib
+from functools import lru_cache
 from typing import Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from PIL import Image
+from PIL.PngImagePlugin import MAX_TEXT_CHUNK
+
+from .json_utils import loads_json
+
+# Patterns compiled once at import instead of looked up on every parse
+_SIZE_RE = re.compile(r"(\d+)x(\d+)")
+_LORA_TAG_RE = re.compile(r"<lora:([^:>]+):([0-9.]+)>")
+_MODEL_EXT_RE = re.compile(r"\.(safetensors|ckpt|gguf|bin|pt|pth)$", re.IGNORECASE)
+_LORA_EXT_RE = re.compile(r"\.(safetensors|pt)$")
+
+# Model loader node class types (case-insensitive substring match)
+_MODEL_LOADER_TYPES = (
+    "CheckpointLoader", "CheckpointSimple",
+    "DiffusionLoader", "UNETLoader", "GGUFLoader",
+    "ModelLoader", "LoadDiffusionModel", "Load Diffusion Model",
+    "Unet Loader", "GGUF", "Checkpoint",
+)
+_MODEL_LOADER_RE = re.compile("|".join(map(re.escape, _MODEL_LOADER_TYPES)), re.IGNORECASE)
+
+_NEGATIVE_PREFIX = "Negative prompt:"
+
+# String inputs that are never prompts (smart prompt detection)
+_FILE_EXTENSIONS = (".safetensors", ".ckpt", ".pt", ".pth", ".bin", ".png", ".jpg")
+_NON_PROMPT_VALUES = frozenset(("enable", "disable", "true", "false", "none", "default"))
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Text chunk keywords read_image_metadata uses
+_PNG_TEXT_KEYS = frozenset((b"parameters", b"prompt", b"workflow"))
 
 
 @dataclass
@@ -83,6 +114,124 @@ class GenerationParams:
         return lines
 
 
+def _find_delimiter(line: str, start: int) -> int:
+    """Index of the first ':' or ',' at or after start (len(line) if none)."""
+    colon = line.find(":", start)
+    comma = line.find(",", start)
+    if colon == -1:
+        return len(line) if comma == -1 else comma
+    if comma == -1:
+        return colon
+    return min(colon, comma)
+
+
+def _iter_a1111_pairs(line: str):
+    """
+    Yield raw (key, value) pairs from an A1111 parameters line.
+
+    Linear scan giving the same pairs as the former regex
+    ([^:,]+):\\s*([^,]+(?:,\\s*[^:,]+)*?)(?=,\\s*[^:,]+:|$)
+    once keys and values are stripped, as the caller does. Raw values
+    differ: the regex's \\s* dropped whitespace after the colon, the scan
+    keeps it. A value runs up to the comma that starts the next "key:"
+    segment, so comma-separated values without a colon
+    (e.g. "Size: 512, 768") stay whole.
+    """
+    n = len(line)
+    pos = 0
+    while pos < n:
+        if line[pos] in ":,":
+            pos += 1
+            continue
+
+        # Key runs to the next delimiter, which must be a colon
+        colon = _find_delimiter(line, pos)
+        if colon == n or line[colon] == ",":
+            pos = colon + 1
+            continue
+
+        # Value needs at least one character before the next comma
+        start = colon + 1
+        end = line.find(",", start)
+        if end == -1:
+            end = n
+        if end == start:
+            pos = colon + 1
+            continue
+
+        # Extend over following segments until one looks like "key:"
+        while end < n:
+            seg = end + 1
+            delim = _find_delimiter(line, seg)
+            if delim == seg:
+                end = -1  # Empty segment: no match from this key
+                break
+            if delim < n and line[delim] == ":":
+                break
+            end = delim
+
+        if end == -1:
+            pos = colon + 1
+            continue
+
+        yield line[pos:colon], line[start:end]
+        pos = end
+
+
+def _set_size(params: GenerationParams, value: str) -> None:
+    match = _SIZE_RE.match(value)
+    if match:
+        params.width = int(match.group(1))
+        params.height = int(match.group(2))
+
+
+def _set_steps(params: GenerationParams, value: str) -> None:
+    params.steps = int(value)
+
+
+def _set_cfg(params: GenerationParams, value: str) -> None:
+    params.cfg = float(value)
+
+
+def _set_seed(params: GenerationParams, value: str) -> None:
+    params.seed = int(value)
+
+
+def _set_sampler(params: GenerationParams, value: str) -> None:
+    params.sampler = value
+
+
+def _set_scheduler(params: GenerationParams, value: str) -> None:
+    params.scheduler = value
+
+
+def _set_model(params: GenerationParams, value: str) -> None:
+    params.model = value
+
+
+def _set_denoise(params: GenerationParams, value: str) -> None:
+    params.denoise = float(value)
+
+
+# Lowercase A1111 key -> setter that converts and stores the value
+_A1111_SETTERS = {
+    "steps": _set_steps,
+    "cfg scale": _set_cfg,
+    "seed": _set_seed,
+    "sampler": _set_sampler,
+    "scheduler": _set_scheduler,
+    "size": _set_size,
+    "model": _set_model,
+    "denoising strength": _set_denoise,
+}
+
+
+def _line_end(text: str, pos: int) -> int:
+    """Index of the newline ending the line that contains pos (or len(text))."""
+    end = text.find("\n", pos)
+    return len(text) if end == -1 else end
+
+
 def parse_a1111_format(text: str) -> GenerationParams:
     """
     Parse A1111/Civitai format metadata.
@@ -93,67 +242,103 @@ def parse_a1111_format(text: str) -> GenerationParams:
     Negative prompt: bad quality
     Steps: 30, Sampler: Euler a, CFG scale: 7, Seed: 12345, Size: 512x512, Model: sd_xl_base_1.0
     ```
+
+    Results are cached per text; every call returns its own copy.
     """
+    return _copy_params(_parse_a1111_format(text))
+
+
+@lru_cache(maxsize=256)
+def _parse_a1111_format(text: str) -> GenerationParams:
     params = GenerationParams()
 
-    lines = text.strip().split("\n")
+    text = text.strip()
+
+    # Slice the three lines we need instead of splitting every line.
+    # Positive prompt: first line, unless it holds parameters or the negative
+    first_line = text[:_line_end(text, 0)]
+    if "Steps:" not in first_line and _NEGATIVE_PREFIX not in first_line:
+        params.positive_prompt = first_line.strip()
 
-    # Find the parameters line (contains "Steps:")
+    # Negative prompt: last line starting with the prefix
+    neg_start = text.rfind("\n" + _NEGATIVE_PREFIX) + 1
+    if neg_start or text.startswith(_NEGATIVE_PREFIX):
+        neg_line = text[neg_start:_line_end(text, neg_start)]
+        params.negative_prompt = neg_line[len(_NEGATIVE_PREFIX):].strip()
+
+    # Find the parameters line: last line with "Steps:" that isn't the negative prompt
     param_line = ""
-    for i, line in enumerate(lines):
-        if line.startswith("Negative prompt:"):
-            params.negative_prompt = line[len("Negative prompt:"):].strip()
-        elif "Steps:" in line:
-            param_line = line
-        elif i == 0 and "Steps:" not in line and "Negative prompt:" not in line:
-            params.positive_prompt = line.strip()
+    steps_pos = text.rfind("Steps:")
+    while steps_pos != -1:
+        line_start = text.rfind("\n", 0, steps_pos) + 1
+        if not text.startswith(_NEGATIVE_PREFIX, line_start):
+            param_line = text[line_start:_line_end(text, steps_pos)]
+            break
+        steps_pos = text.rfind("Steps:", 0, line_start)
 
     # Parse key-value pairs from param line
     if param_line:
         # Split by comma, but handle nested values
-        pairs = re.findall(r'([^:,]+):\s*([^,]+(?:,\s*[^:,]+)*?)(?=,\s*[^:,]+:|$)', param_line)
-        for key, value in pairs:
-            key = key.strip().lower()
-            value = value.strip()
-
-            if key == "steps":
-                params.steps = int(value)
-            elif key == "cfg scale":
-                params.cfg = float(value)
-            elif key == "seed":
-                params.seed = int(value)
-            elif key == "sampler":
-                params.sampler = value
-            elif key == "scheduler":
-                params.scheduler = value
-            elif key == "size":
-                match = re.match(r"(\d+)x(\d+)", value)
-                if match:
-                    params.width = int(match.group(1))
-                    params.height = int(match.group(2))
-            elif key == "model":
-                params.model = value
-            elif key == "denoising strength":
-                params.denoise = float(value)
+        for key, value in _iter_a1111_pairs(param_line):
+            setter = _A1111_SETTERS.get(key.strip().lower())
+            if setter is not None:
+                setter(params, value.strip())
 
         # Parse LoRAs from prompt (format: <lora:name:weight>)
         if params.positive_prompt:
-            lora_matches = re.findall(r"<lora:([^:>]+):([0-9.]+)>", params.positive_prompt)
+            lora_matches = _LORA_TAG_RE.findall(params.positive_prompt)
             params.loras = [(name, float(weight)) for name, weight in lora_matches]
 
     return params
 
 
+def _copy_params(params: GenerationParams) -> GenerationParams:
+    """Copy of cached params, with its own loras list."""
+    return replace(params, loras=list(params.loras))
+
+
+def _basename(path: str) -> str:
+    """Strip the directory part of a path with either / or \\ separators."""
+    return path[max(path.rfind("/"), path.rfind("\\")) + 1:]
+
+
+def _classify_node(class_type: str) -> tuple[bool, bool, bool, bool, bool]:
+    """
+    Which parse_comfyui_format sections apply to a node class type.
+
+    Returns:
+        (is_sampler, is_model_loader, is_lora, is_latent_size, is_text_encode)
+    """
+    return (
+        "KSampler" in class_type,
+        _MODEL_LOADER_RE.search(class_type) is not None,
+        "Lora" in class_type,
+        "EmptyLatentImage" in class_type or "LatentSize" in class_type,
+        "CLIPTextEncode" in class_type,
+    )
+
+
+# Workflows reuse a small set of class types: classify each one only once
+_classify_node_cached = lru_cache(maxsize=1024)(_classify_node)
+
+
 def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None) -> GenerationParams:
     """
     Parse ComfyUI format metadata (JSON workflow).
 
     The prompt contains node inputs with class_type and inputs.
+    Results are cached per prompt; every call returns its own copy.
     """
+    return _copy_params(_parse_comfyui_format(prompt_json))
+
+
+# Keyed on the prompt only: the workflow isn't parsed, and these strings are large
+@lru_cache(maxsize=64)
+def _parse_comfyui_format(prompt_json: str) -> GenerationParams:
     params = GenerationParams()
 
     try:
-        prompt = json.loads(prompt_json)
+        prompt = loads_json(prompt_json)
     except json.JSONDecodeError:
         return params
 
@@ -165,8 +350,11 @@ def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None)
         class_type = node_data.get("class_type", "")
         inputs = node_data.get("inputs", {})
 
+        classify = _classify_node_cached if type(class_type) is str else _classify_node
+        is_sampler, is_model_loader, is_lora, is_latent_size, is_text_encode = classify(class_type)
+
         # KSampler / KSamplerAdvanced
-        if "KSampler" in class_type:
+        if is_sampler:
             if "seed" in inputs:
                 seed_val = inputs["seed"]
                 if isinstance(seed_val, (int, float)):
@@ -183,14 +371,6 @@ def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None)
                 params.denoise = float(inputs["denoise"])
 
         # Model loaders - many different types
-        model_loader_types = [
-            "CheckpointLoader", "CheckpointSimple",
-            "DiffusionLoader", "UNETLoader", "GGUFLoader",
-            "ModelLoader", "LoadDiffusionModel", "Load Diffusion Model",
-            "Unet Loader", "GGUF", "Checkpoint"
-        ]
-        is_model_loader = any(t.lower() in class_type.lower() for t in model_loader_types)
-
         if is_model_loader:
             # Try different field names for model
             model_fields = ["ckpt_name", "unet_name", "model_name", "diffusion_model", "gguf_name", "name"]
@@ -198,40 +378,38 @@ def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None)
                 if field in inputs and inputs[field]:
                     model_name = str(inputs[field])
                     # Remove path
-                    model_name = model_name.rsplit("/", 1)[-1]
-                    model_name = model_name.rsplit("\\", 1)[-1]
+                    model_name = _basename(model_name)
                     # Remove extension
-                    model_name = re.sub(r"\.(safetensors|ckpt|gguf|bin|pt|pth)$", "", model_name, flags=re.IGNORECASE)
+                    model_name = _MODEL_EXT_RE.sub("", model_name)
                     if model_name and not params.model:
                         params.model = model_name
                     break
 
-        # LoraLoader
-        if "LoraLoader" in class_type or "Lora" in class_type:
+        # LoraLoader (and anything else with "Lora" in its class type)
+        if is_lora:
             lora_name = inputs.get("lora_name", "")
             strength = inputs.get("strength_model", inputs.get("strength", 1.0))
             if lora_name:
                 # Clean up lora name
-                lora_name = lora_name.rsplit("/", 1)[-1]
-                lora_name = lora_name.rsplit("\\", 1)[-1]
-                lora_name = re.sub(r"\.(safetensors|pt)$", "", lora_name)
+                lora_name = _basename(lora_name)
+                lora_name = _LORA_EXT_RE.sub("", lora_name)
                 params.loras.append((lora_name, float(strength)))
 
         # EmptyLatentImage (for resolution)
-        if "EmptyLatentImage" in class_type or "LatentSize" in class_type:
+        if is_latent_size:
             if "width" in inputs:
                 params.width = int(inputs["width"])
             if "height" in inputs:
                 params.height = int(inputs["height"])
             # Handle resolution picker format like "768x1280 (0.6)"
             if "resolution" in inputs:
-                res_match = re.match(r"(\d+)x(\d+)", str(inputs["resolution"]))
+                res_match = _SIZE_RE.match(str(inputs["resolution"]))
                 if res_match:
                     params.width = int(res_match.group(1))
                     params.height = int(res_match.group(2))
 
         # CLIPTextEncode - explicit prompt detection
-        if "CLIPTextEncode" in class_type:
+        if is_text_encode:
             text = inputs.get("text", "")
             if text and len(text) > 10:
                 # Check if this is connected to negative (ConditioningZeroOut means it's used as negative base)
@@ -247,11 +425,11 @@ def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None)
                 continue
 
             # Skip if it looks like a file path or technical value
-            if "/" in field_value or "\\" in field_value:
-                continue
-            if field_value.endswith((".safetensors", ".ckpt", ".pt", ".pth", ".bin", ".png", ".jpg")):
-                continue
-            if field_value in ("enable", "disable", "true", "false", "none", "default"):
+            if (
+                "/" in field_value or "\\" in field_value
+                or field_value in _NON_PROMPT_VALUES
+                or field_value.endswith(_FILE_EXTENSIONS)
+            ):
                 continue
 
             # Check if it looks like a prompt (has descriptive words)
@@ -263,12 +441,14 @@ def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None)
             )
 
             if looks_like_prompt:
-                # Determine if positive or negative
+                # Determine if positive or negative (hint words in the first 100 chars;
+                # lowercase only that slice, not the whole value, once)
+                head = field_value[:100].lower()
                 is_negative = (
                     "negative" in field_name.lower() or
-                    "bad" in field_value.lower()[:100] or
-                    "ugly" in field_value.lower()[:100] or
-                    "worst" in field_value.lower()[:100]
+                    "bad" in head or
+                    "ugly" in head or
+                    "worst" in head
                 )
 
                 if is_negative:
@@ -281,6 +461,71 @@ def parse_comfyui_format(prompt_json: str, workflow_json: Optional[str] = None)
     return params
 
 
+def _inflate_text(data: bytes) -> bytes:
+    """zlib-decompress a text chunk, refusing output over PIL's MAX_TEXT_CHUNK."""
+    inflater = zlib.decompressobj()
+    text = inflater.decompress(data, MAX_TEXT_CHUNK)
+    if inflater.unconsumed_tail:
+        raise zlib.error("Decompressed text chunk too large")
+    return text
+
+
+def _decode_png_text(chunk_type: bytes, data: bytes) -> Optional[str]:
+    """Decode the part of a tEXt/zTXt/iTXt chunk after the keyword."""
+    try:
+        if chunk_type == b"tEXt":
+            return data.decode("latin-1")
+        if chunk_type == b"zTXt":
+            # Compression method byte, then zlib stream
+            return _inflate_text(data[1:]).decode("latin-1")
+        # iTXt: compression flag, method, language\0, translated keyword\0, text
+        compressed = data[0]
+        _, _, rest = data[2:].partition(b"\0")
+        _, _, text = rest.partition(b"\0")
+        if compressed:
+            text = _inflate_text(text)
+        return text.decode("utf-8")
+    except (IndexError, zlib.error, UnicodeDecodeError):
+        return None
+
+
+def _read_png_text_chunks(image_path: str) -> Optional[dict]:
+    """
+    Read the metadata text chunks of a PNG without decoding the image.
+
+    Walks the chunk list up to the first IDAT, the same chunks PIL
+    exposes in Image.info, and only decodes the keywords in _PNG_TEXT_KEYS.
+
+    Returns:
+        Dict of keyword -> text, or None if the file is not a PNG
+    """
+    texts = {}
+    with open(image_path, "rb") as f:
+        if f.read(8) != _PNG_SIGNATURE:
+            return None
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length = int.from_bytes(header[:4], "big")
+            chunk_type = header[4:]
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+
+            if chunk_type in (b"tEXt", b"zTXt", b"iTXt"):
+                keyword, sep, data = f.read(length).partition(b"\0")
+                if sep and keyword in _PNG_TEXT_KEYS:
+                    text = _decode_png_text(chunk_type, data)
+                    if text is not None:
+                        texts[keyword.decode("latin-1")] = text
+                f.seek(4, 1)  # CRC
+            else:
+                f.seek(length + 4, 1)
+
+    return texts
+
+
 def read_image_metadata(image_path: str) -> GenerationParams:
     """
     Read and parse metadata from an image file.
@@ -297,8 +542,23 @@ def read_image_metadata(image_path: str) -> GenerationParams:
         GenerationParams with extracted data (empty if no metadata)
     """
     try:
-        img = Image.open(image_path)
-        metadata = img.info
+        stat = os.stat(image_path)
+    except (OSError, TypeError, ValueError):
+        return GenerationParams()
+
+    # Cached per file version; hand out a copy so callers can't alter the cache
+    return _copy_params(_read_image_metadata_cached(image_path, stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=512)
+def _read_image_metadata_cached(image_path: str, mtime_ns: int, size: int) -> GenerationParams:
+    """Parse an image's metadata; mtime_ns and size only key the cache."""
+    try:
+        # PNG: read just the text chunks; other formats go through PIL
+        metadata = _read_png_text_chunks(image_path)
+        if metadata is None:
+            with Image.open(image_path) as img:
+                metadata = img.info
     except Exception:
         return GenerationParams()
 
@@ -24,8 +24,25 @@ def ensure_bhwc(tensor: torch.Tensor) -> torch.Tensor:
     Returns:
         Tensor with shape (B, H, W, C)
     """
-    if tensor.dim() == 3:
-        return tensor.unsqueeze(0)
+    return tensor.unsqueeze(0) if tensor.ndim == 3 else tensor
+
+
+def ensure_contiguous_bhwc(tensor: torch.Tensor) -> torch.Tensor:
+    """
+    Ensure tensor is BHWC and contiguous in memory.
+
+    Upstream nodes may hand over permuted or sliced views. Converting once
+    here keeps later per-image NumPy/PIL conversions on the fast path.
+
+    Args:
+        tensor: Image tensor, either (H, W, C) or (B, H, W, C)
+
+    Returns:
+        Contiguous tensor with shape (B, H, W, C)
+    """
+    tensor = ensure_bhwc(tensor)
+    if not tensor.is_contiguous():
+        tensor = tensor.contiguous()
     return tensor
 
 
@@ -39,28 +56,35 @@ def ensure_mask_batch(mask: torch.Tensor) -> torch.Tensor:
     Returns:
         Tensor with shape (B, H, W)
     """
-    if mask.dim() == 2:
-        return mask.unsqueeze(0)
-    return mask
+    return mask.unsqueeze(0) if mask.ndim == 2 else mask
 
 
-def to_pil(tensor: torch.Tensor, index: int = 0) -> Image.Image:
+def _to_uint8(tensor: torch.Tensor) -> torch.Tensor:
+    """Scale 0.0-1.0 values to uint8 on the tensor's device, then move to CPU."""
+    return tensor.mul(255).clamp_(0, 255).to(torch.uint8).cpu()
+
+
+def to_uint8_array(tensor: torch.Tensor) -> np.ndarray:
     """
-    Convert ComfyUI IMAGE tensor to PIL Image.
+    Convert a whole IMAGE batch to a uint8 NumPy array in one pass.
 
     Args:
         tensor: Image tensor (B, H, W, C) with values 0.0-1.0
-        index: Batch index to extract
 
     Returns:
-        PIL Image in RGB or RGBA mode (depending on channels)
+        uint8 array (B, H, W, C), values 0-255
     """
     tensor = ensure_bhwc(tensor)
-    # Get single image from batch
-    img = tensor[index]
-    # Convert to numpy and scale to 0-255
-    img_np = (img.cpu().numpy() * 255).astype(np.uint8)
+    return _to_uint8(tensor).numpy()
+
 
+def array_to_pil(img_np: np.ndarray) -> Image.Image:
+    """
+    Wrap a single uint8 (H, W, C) array as a PIL Image.
+
+    Returns:
+        PIL Image in RGB or RGBA mode (depending on channels)
+    """
     # Check number of channels
     channels = img_np.shape[2] if img_np.ndim == 3 else 1
     if channels == 4:
@@ -74,6 +98,41 @@ def to_pil(tensor: torch.Tensor, index: int = 0) -> Image.Image:
         return Image.fromarray(img_np[:, :, :3], mode="RGB")
 
 
+def to_pil(tensor: torch.Tensor, index: int = 0) -> Image.Image:
+    """
+    Convert ComfyUI IMAGE tensor to PIL Image.
+
+    Args:
+        tensor: Image tensor (B, H, W, C) with values 0.0-1.0
+        index: Batch index to extract
+
+    Returns:
+        PIL Image in RGB or RGBA mode (depending on channels)
+    """
+    tensor = ensure_bhwc(tensor)
+    # Get single image from batch
+    img = tensor[index]
+    # Scale to 0-255 on the tensor's device, transfer as uint8
+    img_np = _to_uint8(img).numpy()
+    return array_to_pil(img_np)
+
+
+def to_pil_batch(tensor: torch.Tensor) -> list[Image.Image]:
+    """
+    Convert a whole ComfyUI IMAGE batch to PIL Images.
+
+    The batch is quantized and moved to the CPU in one transfer,
+    instead of once per index as with to_pil.
+
+    Args:
+        tensor: Image tensor (B, H, W, C) with values 0.0-1.0
+
+    Returns:
+        List of PIL Images in RGB or RGBA mode (depending on channels)
+    """
+    return [array_to_pil(img_np) for img_np in to_uint8_array(tensor)]
+
+
 def from_pil(image: Image.Image) -> torch.Tensor:
     """
     Convert PIL Image to ComfyUI IMAGE tensor.
@@ -84,13 +143,38 @@ def from_pil(image: Image.Image) -> torch.Tensor:
     Returns:
         Tensor with shape (1, H, W, C) and values 0.0-1.0
     """
-    # Convert to RGB if needed
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-    # Convert to numpy array
-    img_np = np.array(image).astype(np.float32) / 255.0
-    # Convert to tensor and add batch dimension
-    return torch.from_numpy(img_np).unsqueeze(0)
+    # Scale straight into the tensor (any mode is read as RGB), then add batch dimension
+    out = torch.empty((image.height, image.width, 3), dtype=torch.float32)
+    return from_pil_into(image, out).unsqueeze(0)
+
+
+def from_pil_into(image: Image.Image, out: torch.Tensor) -> torch.Tensor:
+    """
+    Convert PIL Image straight into a preallocated IMAGE slot.
+
+    Same values as from_pil, without the intermediate float tensor.
+    RGB, RGBA and L are read without a PIL mode conversion.
+
+    Args:
+        image: PIL Image (converted to RGB if needed)
+        out: CPU float32 tensor (H, W, 3), e.g. output[i] of a batch
+
+    Returns:
+        out, filled with values 0.0-1.0
+    """
+    mode = image.mode
+    if mode == "RGB":
+        pixels = np.asarray(image)
+    elif mode == "RGBA":
+        # Same as convert("RGB"): alpha is dropped, not blended
+        pixels = np.asarray(image)[:, :, :3]
+    elif mode == "L":
+        # Gray broadcasts across the three channels
+        pixels = np.asarray(image)[:, :, None]
+    else:
+        pixels = np.asarray(image.convert("RGB"))
+    np.divide(pixels, np.float32(255.0), out=out.numpy())
+    return out
 
 
 def clone_tensor(tensor: torch.Tensor) -> torch.Tensor:
@@ -5,26 +5,20 @@ Uses system fonts via PIL to render text on images.
 """
 # path-lint-skip: intentional Windows/macOS/Linux system font paths
 
+import math
 import os
 import sys
+from functools import lru_cache
 from typing import Optional
 from PIL import Image, ImageDraw, ImageFont
 
 
-def get_system_font(size: int = 16, bold: bool = False) -> ImageFont.FreeTypeFont:
-    """
-    Get a system monospace font.
+# Resolved font file per bold flag (None = no usable system font)
+_FONT_PATH_CACHE: dict[bool, Optional[str]] = {}
 
-    Tries common font locations across platforms.
-    Falls back to PIL default if nothing found.
 
-    Args:
-        size: Font size in pixels
-        bold: Use bold variant if available
-
-    Returns:
-        PIL Font object
-    """
+def _font_candidates(bold: bool) -> list[str]:
+    """Candidate system font paths for this platform, in priority order."""
     # Fonts with good Unicode/Thai support (prioritized first)
     # Then fallback to monospace fonts
     font_candidates = []
@@ -77,13 +71,55 @@ def get_system_font(size: int = 16, bold: bool = False) -> ImageFont.FreeTypeFon
                           for f in font_candidates]
         font_candidates = bold_candidates + font_candidates
 
-    # Try each font
-    for font_path in font_candidates:
-        if os.path.exists(font_path):
+    return font_candidates
+
+
+def _resolve_font_path(bold: bool) -> Optional[str]:
+    """
+    Find the first loadable system font, scanning the disk only once.
+
+    Returns:
+        Font file path, or None if no candidate could be loaded
+    """
+    if bold in _FONT_PATH_CACHE:
+        return _FONT_PATH_CACHE[bold]
+
+    font_path = None
+    for candidate in _font_candidates(bold):
+        if os.path.exists(candidate):
             try:
-                return ImageFont.truetype(font_path, size)
+                ImageFont.truetype(candidate)
             except Exception:
                 continue
+            font_path = candidate
+            break
+
+    _FONT_PATH_CACHE[bold] = font_path
+    return font_path
+
+
+@lru_cache(maxsize=32)
+def get_system_font(size: int = 16, bold: bool = False) -> ImageFont.FreeTypeFont:
+    """
+    Get a system monospace font.
+
+    Tries common font locations across platforms.
+    Falls back to PIL default if nothing found.
+    Fonts are cached per (size, bold) and shared; only draw with them.
+
+    Args:
+        size: Font size in pixels
+        bold: Use bold variant if available
+
+    Returns:
+        PIL Font object
+    """
+    font_path = _resolve_font_path(bold)
+    if font_path is not None:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except Exception:
+            pass
 
     # Fallback to PIL default
     try:
@@ -96,6 +132,13 @@ def get_system_font(size: int = 16, bold: bool = False) -> ImageFont.FreeTypeFon
 class TextRenderer:
     """Renders text overlays on images."""
 
+    # Max cached text measurements per renderer
+    SIZE_CACHE_LIMIT = 4096
+    # Max cached background strips per renderer (widths cluster)
+    BG_CACHE_LIMIT = 8
+    # Max cached rendered text blocks per renderer
+    BLOCK_CACHE_LIMIT = 32
+
     def __init__(
         self,
         font_size: int = 14,
@@ -120,14 +163,42 @@ class TextRenderer:
         self.text_color = text_color
         self.bg_opacity = bg_opacity
         self.font = get_system_font(font_size)
+        # Derived drawing constants (settings are fixed for a renderer's life)
+        self.line_height = font_size + 4
+        self.bg_rgba = (*bg_color, int(255 * bg_opacity))
+        self.text_rgba = (*text_color, 255)
+        # One draw context for measuring, reused by every get_text_size call
+        self._measure_img = Image.new("RGB", (1, 1))
+        self._measure_draw = ImageDraw.Draw(self._measure_img)
+        self._size_cache: dict[str, tuple[int, int]] = {}
+        self._word_cache: dict[str, tuple[float, int, int]] = {}
+        self._bg_cache: dict[tuple[int, int], Image.Image] = {}
+        self._block_cache: dict[tuple, Image.Image] = {}
 
     def get_text_size(self, text: str) -> tuple[int, int]:
-        """Get width and height of text."""
-        # Create temporary image for measuring
-        temp_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(temp_img)
-        bbox = draw.textbbox((0, 0), text, font=self.font)
-        return bbox[2] - bbox[0], bbox[3] - bbox[1]
+        """Get width and height of text (memoized per renderer)."""
+        hit = self._size_cache.get(text)
+        if hit is not None:
+            return hit
+        bbox = self._measure_draw.textbbox((0, 0), text, font=self.font)
+        size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+        if len(self._size_cache) >= self.SIZE_CACHE_LIMIT:
+            # FIFO trim: dicts keep insertion order
+            del self._size_cache[next(iter(self._size_cache))]
+        self._size_cache[text] = size
+        return size
+
+    def _word_metrics(self, word: str) -> tuple[float, int, int]:
+        """Get (advance, ink left, ink right) of a word, memoized per renderer."""
+        hit = self._word_cache.get(word)
+        if hit is not None:
+            return hit
+        bbox = self._measure_draw.textbbox((0, 0), word, font=self.font)
+        metrics = (self.font.getlength(word), bbox[0], bbox[2])
+        if len(self._word_cache) >= self.SIZE_CACHE_LIMIT:
+            del self._word_cache[next(iter(self._word_cache))]
+        self._word_cache[word] = metrics
+        return metrics
 
     def wrap_text(self, text: str, max_width: int) -> list[str]:
         """
@@ -151,42 +222,67 @@ class TextRenderer:
         if text_width <= available_width:
             return [text]
 
-        # Split by words
-        words = text.split(' ')
+        # Greedy fill with a running width: each word is measured once.
+        # A line's ink spans from its first word's left edge to the pen
+        # position of its last word plus that word's right edge.
+        space_advance = self.font.getlength(" ")
         lines = []
-        current_line = ""
-
-        for word in words:
-            test_line = f"{current_line} {word}".strip() if current_line else word
-            test_width, _ = self.get_text_size(test_line)
+        current_words = []
+        pen = 0.0  # advance up to the end of the last word on the line
+        left = 0  # ink left edge of the first word on the line
 
-            if test_width <= available_width:
-                current_line = test_line
-            else:
-                # Word doesn't fit, check if current line has content
-                if current_line:
-                    lines.append(current_line)
-                    current_line = word
-                else:
-                    # Single word too long, force break by character
-                    current_line = self._break_word(word, available_width)
-                    if len(current_line) < len(word):
-                        # There's remaining text
-                        lines.append(current_line)
-                        current_line = word[len(current_line):]
-
-        if current_line:
-            lines.append(current_line)
+        for word in text.split(' '):
+            if not word:
+                continue
+            advance, word_left, word_right = self._word_metrics(word)
+
+            if current_words:
+                start = pen + space_advance
+                if math.ceil(start) + word_right - left <= available_width:
+                    current_words.append(word)
+                    pen = start + advance
+                    continue
+                lines.append(" ".join(current_words))
+                current_words = []
+
+            if word_right - word_left > available_width:
+                # Single word too long, force break by character
+                while True:
+                    piece, rest = self._break_word(word, available_width)
+                    if not rest:
+                        break
+                    lines.append(piece)
+                    word = rest
+                advance, word_left, word_right = self._word_metrics(word)
+
+            current_words = [word]
+            pen = advance
+            left = word_left
+
+        if current_words:
+            lines.append(" ".join(current_words))
 
         return lines
 
-    def _break_word(self, word: str, max_width: int) -> str:
-        """Break a single word to fit within max_width."""
-        for i in range(len(word), 0, -1):
-            width, _ = self.get_text_size(word[:i])
+    def _break_word(self, word: str, max_width: int) -> tuple[str, str]:
+        """
+        Break a single word to fit within max_width.
+
+        Prefix width grows with length, so the longest fitting prefix is
+        found by binary search.
+
+        Returns:
+            (fitting prefix, remainder); the prefix is at least one character
+        """
+        lo, hi = 1, len(word)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            width, _ = self.get_text_size(word[:mid])
             if width <= max_width:
-                return word[:i]
-        return word[:1]  # At minimum return first character
+                lo = mid
+            else:
+                hi = mid - 1
+        return word[:lo], word[lo:]
 
     def wrap_lines(self, lines: list[str], max_width: int) -> list[str]:
         """
@@ -219,23 +315,29 @@ class TextRenderer:
             position: "top" or "bottom" (affects visual style)
 
         Returns:
-            RGBA image with text block
+            RGBA image with text block. Non-empty blocks are cached and
+            shared between calls, so callers must not modify them.
         """
         if not lines:
             return Image.new("RGBA", (width, 1), (0, 0, 0, 0))
 
+        # Batches render the same text on every frame: reuse the block (LRU)
+        key = (tuple(lines), width, position)
+        block = self._block_cache.pop(key, None)
+        if block is None:
+            block = self._render_text_block_uncached(lines, width)
+            if len(self._block_cache) >= self.BLOCK_CACHE_LIMIT:
+                del self._block_cache[next(iter(self._block_cache))]
+        self._block_cache[key] = block
+        return block
+
+    def _render_text_block_uncached(self, lines: list[str], width: int) -> Image.Image:
+        """Draw a non-empty text block onto a fresh background strip."""
         # Calculate dimensions
-        line_height = self.font_size + 4
-        total_height = len(lines) * line_height + self.padding * 2
-
-        # Create RGBA image
-        img = Image.new("RGBA", (width, total_height), (0, 0, 0, 0))
+        total_height = len(lines) * self.line_height + self.padding * 2
 
-        # Draw semi-transparent background
-        bg_alpha = int(255 * self.bg_opacity)
-        bg_img = Image.new("RGBA", (width, total_height),
-                          (*self.bg_color, bg_alpha))
-        img = Image.alpha_composite(img, bg_img)
+        # Start from a copy of the semi-transparent background strip
+        img = self._background_strip(width, total_height).copy()
 
         # Draw text
         draw = ImageDraw.Draw(img)
@@ -244,11 +346,32 @@ class TextRenderer:
             # Center text horizontally
             text_width, _ = self.get_text_size(line)
             x = (width - text_width) // 2
-            draw.text((x, y), line, font=self.font, fill=(*self.text_color, 255))
-            y += line_height
+            draw.text((x, y), line, font=self.font, fill=self.text_rgba)
+            y += self.line_height
 
         return img
 
+    def _background_strip(self, width: int, height: int) -> Image.Image:
+        """Get the solid background RGBA strip for a size (cached; don't mutate)."""
+        key = (width, height)
+        strip = self._bg_cache.get(key)
+        if strip is None:
+            strip = Image.new("RGBA", key, self.bg_rgba)
+            if len(self._bg_cache) >= self.BG_CACHE_LIMIT:
+                del self._bg_cache[next(iter(self._bg_cache))]
+            self._bg_cache[key] = strip
+        return strip
+
+    def clear_image_caches(self):
+        """
+        Drop cached background strips and text blocks.
+
+        Text measurements are small and kept. Call this when a batch is done
+        so a long-lived (shared) renderer doesn't hold full-width images.
+        """
+        self._bg_cache.clear()
+        self._block_cache.clear()
+
     def add_overlay_bottom(
         self,
         image: Image.Image,
@@ -264,10 +387,10 @@ class TextRenderer:
             lines: List of text lines
 
         Returns:
-            New image with overlay added
+            New image with overlay added (the input itself if no lines)
         """
         if not lines:
-            return image.copy()
+            return image
 
         width, height = image.size
 
@@ -305,16 +428,24 @@ class TextRenderer:
             position: "top" or "bottom"
 
         Returns:
-            Image with overlay
+            Image with overlay (the input itself if nothing is drawn)
         """
         if not lines:
-            return image.copy()
+            return image
 
         width, height = image.size
-        result = image.convert("RGBA")
 
-        # Wrap lines to fit image width
+        # Wrap lines to fit image width, keeping only lines that fit inside
+        # the image; the rest would be rendered just to be cropped off
         wrapped_lines = self.wrap_lines(lines, width)
+        max_lines = max(0, (height - self.padding * 2) // self.line_height)
+        wrapped_lines = wrapped_lines[:max_lines]
+        if not wrapped_lines:
+            return image
+
+        # Paste straight onto an RGB copy; the text block's alpha is the mask,
+        # so no RGBA round-trip of the whole image is needed
+        result = image.convert("RGB")
 
         # Render text block
         text_block = self.render_text_block(wrapped_lines, width, position)
@@ -326,7 +457,31 @@ class TextRenderer:
         else:  # bottom
             y = height - text_height
 
-        # Composite
-        result.paste(text_block, (0, y), text_block)
+        # Composite; an opaque background makes the whole block opaque,
+        # so it can be copied in without per-pixel alpha blending
+        if self.bg_rgba[3] == 255:
+            result.paste(text_block, (0, y))
+        else:
+            result.paste(text_block, (0, y), text_block)
+
+        return result
+
 
-        return result.convert("RGB")
+@lru_cache(maxsize=8)
+def get_default_renderer(
+    font_size: int = 14,
+    padding: int = 8,
+    bg_color: tuple = (0, 0, 0),
+    text_color: tuple = (255, 255, 255),
+    bg_opacity: float = 0.7,
+) -> TextRenderer:
+    """
+    Get a shared TextRenderer for a configuration.
+
+    Identical settings return the same instance, so its measurement caches
+    carry over between node runs. Call clear_image_caches() when done
+    rendering, so the shared instance doesn't keep full-width text blocks.
+    Don't change attributes of the returned renderer. Its caches are plain
+    dicts, fine for ComfyUI's single executor thread.
+    """
+    return TextRenderer(font_size, padding, bg_color, text_color, bg_opacity)